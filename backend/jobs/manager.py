@@ -0,0 +1,346 @@
+"""
+Job Manager
+Antrean job lokal: tabel job di SQLite, eksekusi di ProcessPoolExecutor,
+progress + hasil ditulis langsung oleh worker sehingga request interaktif tidak terbebani
+"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+JOB_STATUSES = ['queued', 'running', 'succeeded', 'failed', 'cancelled']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id               TEXT PRIMARY KEY,
+    type             TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    params           TEXT NOT NULL,
+    result           TEXT,
+    error            TEXT,
+    progress         REAL NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    memory_limit_mb  INTEGER,
+    owner_pid        INTEGER,
+    created_at       REAL NOT NULL,
+    started_at       REAL,
+    finished_at      REAL
+)
+"""
+
+
+class JobCancelled(Exception):
+    """Dilempar di worker ketika job dibatalkan saat sedang berjalan"""
+
+
+class JobManager:
+    """
+    Mengelola siklus hidup job: submit -> queued -> running -> succeeded/failed/cancelled.
+
+    - Worker adalah proses terpisah (ProcessPoolExecutor), dibuat saat job pertama masuk.
+      Proses worker dibuat lewat forkserver/spawn, bukan fork dari thread request Flask
+    - Pool yang rusak (worker mati, mis. oleh OOM killer) dibuang dan dibuat ulang saat submit
+    - Pembatalan: job yang masih antre langsung dibatalkan, job yang berjalan dihentikan
+      secara kooperatif pada callback progress berikutnya
+    - Batas memori per job lewat RLIMIT_AS (hanya di Unix)
+    - Tiap job mencatat PID proses server pemiliknya (owner_pid); saat start hanya job milik
+      proses yang sudah mati yang ditandai gagal, sehingga aman dengan banyak worker gunicorn
+    """
+
+    def __init__(self, db_path: str, max_workers: int = 2, default_memory_limit_mb: Optional[int] = None):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.default_memory_limit_mb = default_memory_limit_mb
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with _connect(db_path) as conn:
+            conn.execute(_SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'owner_pid' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+        self.reap_orphans()
+
+    def reap_orphans(self) -> int:
+        """
+        Tandai gagal job queued/running yang proses pemiliknya sudah mati
+        (job tersebut tidak akan pernah selesai). Kembalikan jumlah job yang ditandai.
+        """
+        with _connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT id, owner_pid FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+            orphans = [row['id'] for row in rows if not _pid_alive(row['owner_pid'])]
+            for job_id in orphans:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                    "WHERE id = ? AND status IN ('queued', 'running')",
+                    ('Job terhenti karena proses server pemiliknya berhenti', time.time(), job_id)
+                )
+        return len(orphans)
+
+    def submit(self, job_type: str, params: Dict, memory_limit_mb: Optional[int] = None) -> Dict:
+        """Daftarkan job baru dan jadwalkan ke worker"""
+        job_id = uuid.uuid4().hex
+        memory_limit_mb = memory_limit_mb or self.default_memory_limit_mb
+
+        with _connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, type, status, params, memory_limit_mb, owner_pid, created_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, job_type, json.dumps(params), memory_limit_mb, os.getpid(), time.time())
+            )
+
+        try:
+            future = self._schedule(job_id, job_type, params, memory_limit_mb)
+        except Exception as e:
+            _finish(self.db_path, job_id, 'failed', error=f'Job gagal dijadwalkan: {e}')
+            raise
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+
+        return self.get(job_id)
+
+    def _schedule(self, job_id: str, job_type: str, params: Dict, memory_limit_mb: Optional[int]) -> Future:
+        """Kirim job ke pool; pool yang rusak diganti sekali lalu dicoba lagi"""
+        with self._lock:
+            for attempt in range(2):
+                if self._executor is None:
+                    self._executor = self._create_executor()
+                try:
+                    future = self._executor.submit(_run_job, self.db_path, job_id, job_type, params, memory_limit_mb)
+                    break
+                except BrokenProcessPool:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = None
+                    if attempt:
+                        raise
+            self._futures[job_id] = future
+        return future
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        methods = multiprocessing.get_all_start_methods()
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn'),
+            initializer=_init_worker,
+            initargs=(backend_dir,)
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Status, progress, hasil, dan timing job (None jika tidak ada)"""
+        with _connect(self.db_path) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """Batalkan job; job yang sudah selesai tidak berubah"""
+        with _connect(self.db_path) as conn:
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN ('queued', 'running')",
+                (job_id,)
+            )
+
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            _finish(self.db_path, job_id, 'cancelled')
+
+        return self.get(job_id)
+
+    def _on_done(self, job_id: str, future: Future):
+        """Tandai gagal jika worker mati sebelum sempat menulis status akhir"""
+        with self._lock:
+            self._futures.pop(job_id, None)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            with _connect(self.db_path) as conn:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                    "WHERE id = ? AND status IN ('queued', 'running')",
+                    (f'Worker berhenti: {error}', time.time(), job_id)
+                )
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    """Apakah proses dengan PID ini masih hidup (job lama tanpa owner_pid dianggap yatim)"""
+    if pid is None:
+        return False
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # os.kill di Windows menghentikan proses; tanpa cara aman untuk memeriksa, anggap hidup
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ─── Worker ──────────────────────────────────────────────────────────────────
+
+def _init_worker(backend_dir: str):
+    """Inisialisasi proses worker: path import backend + prioritas rendah"""
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    if hasattr(os, 'nice'):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+
+def _run_job(db_path: str, job_id: str, job_type: str, params: Dict, memory_limit_mb: Optional[int]):
+    """Jalankan satu job di proses worker; status akhir ditulis ke SQLite"""
+    from jobs.tasks import TASKS
+
+    with _connect(db_path) as conn:
+        updated = conn.execute(
+            "UPDATE jobs SET status = 'running', started_at = ? "
+            "WHERE id = ? AND status = 'queued' AND cancel_requested = 0",
+            (time.time(), job_id)
+        ).rowcount
+    if not updated:
+        # Dibatalkan saat masih antre
+        with _connect(db_path) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+        return
+
+    last_check = [0.0]
+
+    def progress(done: int, total: int):
+        now = time.monotonic()
+        if now - last_check[0] < 0.25 and done < total:
+            return
+        last_check[0] = now
+        with _connect(db_path) as conn:
+            conn.execute("UPDATE jobs SET progress = ? WHERE id = ?", (done / total if total else 1.0, job_id))
+            cancelled = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        if cancelled:
+            raise JobCancelled()
+
+    status, result, error = 'failed', None, None
+    previous_limit = _set_memory_limit(memory_limit_mb)
+    try:
+        fn = TASKS[job_type]
+        result = fn(params, progress, job_id)
+        status = 'succeeded'
+    except JobCancelled:
+        status = 'cancelled'
+    except MemoryError:
+        error = f'Batas memori job ({memory_limit_mb} MB) terlampaui'
+    except Exception as e:
+        error = str(e)
+    finally:
+        _restore_memory_limit(previous_limit)
+
+    _finish(db_path, job_id, status, result=result, error=error)
+
+
+def _set_memory_limit(memory_limit_mb: Optional[int]):
+    """
+    Pasang batas address space untuk job ini (di atas pemakaian worker saat ini);
+    kembalikan batas sebelumnya
+    """
+    if resource is None or not memory_limit_mb:
+        return None
+    previous = resource.getrlimit(resource.RLIMIT_AS)
+    limit = _address_space_bytes() + memory_limit_mb * 1024 * 1024
+    if previous[1] != resource.RLIM_INFINITY:
+        limit = min(limit, previous[1])
+    resource.setrlimit(resource.RLIMIT_AS, (limit, previous[1]))
+    return previous
+
+
+def _address_space_bytes() -> int:
+    """Ukuran address space proses saat ini (Linux: /proc/self/statm, selain itu 0)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _restore_memory_limit(previous):
+    if resource is not None and previous is not None:
+        resource.setrlimit(resource.RLIMIT_AS, previous)
+
+
+# ─── SQLite Helpers ──────────────────────────────────────────────────────────
+
+def _connect(db_path: str) -> '_ClosingConnection':
+    """Koneksi pendek per operasi; WAL agar pembaca tidak terblokir oleh worker"""
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return _ClosingConnection(conn)
+
+
+class _ClosingConnection:
+    """Context manager yang menutup koneksi (sqlite3.Connection hanya commit/rollback)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._conn
+
+    def __exit__(self, *exc):
+        self._conn.close()
+
+
+def _finish(db_path: str, job_id: str, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+    """Tulis status akhir job"""
+    with _connect(db_path) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+            "progress = CASE WHEN ? = 'succeeded' THEN 1 ELSE progress END WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), status, job_id)
+        )
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict:
+    """Representasi job untuk API, termasuk timing"""
+    created, started, finished = row['created_at'], row['started_at'], row['finished_at']
+    return {
+        'id': row['id'],
+        'type': row['type'],
+        'status': row['status'],
+        'progress': round(row['progress'], 4),
+        'cancel_requested': bool(row['cancel_requested']),
+        'memory_limit_mb': row['memory_limit_mb'],
+        'result': json.loads(row['result']) if row['result'] else None,
+        'error': row['error'],
+        'timing': {
+            'created_at': created,
+            'started_at': started,
+            'finished_at': finished,
+            'queued_seconds': round((started or finished or time.time()) - created, 3),
+            'run_seconds': round((finished or time.time()) - started, 3) if started else None,
+        },
+    }
@@ -0,0 +1,191 @@
+"""
+Job Tasks
+Operasi batch SAWCalculator yang terlalu lama untuk dijalankan di dalam request.
+Tiap task: fn(params, progress, job_id) -> dict hasil (JSON-serializable)
+"""
+
+import os
+import numpy as np
+from typing import Callable, Dict, List
+
+from models.data import SUBJECTS
+from models.saw_calculator import (
+    SAWCalculator, DEFAULT_WEIGHTS, CRITERIA_KEYS, top_k_indices, rank_descending
+)
+from models.cohort_store import CohortStore
+
+
+ProgressFn = Callable[[int, int], None]
+
+# Store kohort bersama (dibuka oleh worker web untuk ingest dan oleh worker job)
+COHORT_STORE_PATH = os.environ.get(
+    'COHORT_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'cohort')
+)
+
+
+def batch_recommend(params: Dict, progress: ProgressFn, job_id: str) -> Dict:
+    """
+    Rekomendasi SAW untuk satu angkatan sekaligus.
+
+    Params:
+        students: List[{student_name?, grades, riasec_scores, aspiration}]
+        custom_weights: Dict (opsional)
+        top_k: int (opsional, default 5)
+    """
+    students: List[Dict] = params['students']
+    top_k = params.get('top_k', 5)
+
+    saw = SAWCalculator()
+    saw.set_subject_criteria(params.get('custom_weights'))
+
+    chunk = 256
+    results = []
+    for start in range(0, len(students), chunk):
+        block = students[start:start + chunk]
+        # float64 + aturan seri rank_descending: urutan identik dengan /recommend
+        tensor = np.array([saw.build_subject_matrix(s, SUBJECTS) for s in block], dtype=np.float64)
+        scores = saw.calculate_batch(tensor)
+        idx = top_k_indices(scores, top_k)
+
+        for i, student in enumerate(block):
+            results.append({
+                'index': start + i,
+                'student_name': student.get('student_name', ''),
+                'top_subjects': [
+                    {'subject': SUBJECTS[j]['name'], 'score': round(float(scores[i, j]), 4)}
+                    for j in idx[i]
+                ],
+            })
+        progress(start + len(block), len(students))
+
+    return {'total_students': len(students), 'students': results}
+
+
+def cohort_ingest(params: Dict, progress: ProgressFn, job_id: str) -> Dict:
+    """
+    Impor satu angkatan ke CohortStore (matriks kriteria mentah per siswa).
+
+    Params:
+        students: List[{student_id, grades, riasec_scores, aspiration}]
+    """
+    students: List[Dict] = params['students']
+    store = CohortStore.open_or_create(COHORT_STORE_PATH, SUBJECTS)
+    saw = SAWCalculator()
+
+    chunk = 1024
+    first = None
+    for start in range(0, len(students), chunk):
+        block = students[start:start + chunk]
+        tensor = np.array([saw.build_subject_matrix(s, SUBJECTS) for s in block], dtype=np.float32)
+        rows = store.append(tensor, np.array([s['student_id'] for s in block], dtype=np.int64))
+        first = rows[0] if first is None else first
+        progress(start + len(block), len(students))
+
+    return {'ingested': len(students), 'first_row': int(first), 'total_students': len(store)}
+
+
+def cohort_rescore(params: Dict, progress: ProgressFn, job_id: str) -> Dict:
+    """
+    Rescore seluruh siswa di CohortStore (COHORT_STORE_PATH) dengan bobot / nilai minimum baru.
+    Hasil lengkap per siswa disimpan ke file rescore-<job_id>.npz di direktori store.
+
+    Params:
+        custom_weights: Dict (opsional)
+        min_grades: Dict[str, float] (opsional, default min_grade katalog)
+        top_k: int (opsional, default 5)
+    """
+    store = CohortStore.open_or_create(COHORT_STORE_PATH, SUBJECTS)
+    min_grades = params.get('min_grades') or {s['name']: s['min_grade'] for s in SUBJECTS}
+    result = store.rescore(
+        weights=params.get('custom_weights'),
+        min_grades=min_grades,
+        top_k=params.get('top_k', 5),
+        progress=progress,
+    )
+
+    output_file = f'rescore-{job_id}.npz'
+    np.savez(os.path.join(COHORT_STORE_PATH, output_file), **result)
+
+    n = len(result['student_ids'])
+    top1 = np.bincount(result['top_subjects'][:, 0], minlength=len(store.subject_names)) \
+        if n else np.zeros(len(store.subject_names), dtype=np.int64)
+    return {
+        'total_students': n,
+        'output_file': output_file,
+        'top1_distribution': {name: int(top1[j]) for j, name in enumerate(store.subject_names)},
+        'meets_minimum_rate': round(float(result['meets_minimum'].mean()), 4) if n else None,
+    }
+
+
+def weight_sweep(params: Dict, progress: ProgressFn, job_id: str) -> Dict:
+    """
+    Analisis sensitivitas bobot: semua kombinasi bobot pada grid simplex (kelipatan `step`).
+
+    Params:
+        student: {grades, riasec_scores, aspiration}
+        step: float (opsional, default 0.05; harus membagi habis 1.0)
+        top_k: int (opsional, default 5)
+    """
+    step = params.get('step', 0.05)
+    top_k = params.get('top_k', 5)
+    n = int(round(1.0 / step))    # schemas memastikan step membagi habis 1.0
+
+    saw = SAWCalculator()
+    saw.set_subject_criteria()
+    matrix = np.array(saw.build_subject_matrix(params['student'], SUBJECTS), dtype=float)
+    normalized = saw.normalize(matrix)
+    baseline = saw.calculate(matrix)['ranks']
+
+    # Komposisi bilangan bulat a+b+c+d = n -> bobot (a, b, c, d) / n, diproses per nilai a
+    # agar memori terbatas dan progress / cancel dicek per chunk
+    total = (n + 1) * (n + 2) * (n + 3) // 6
+    n_subjects = len(SUBJECTS)
+    best = np.full(n_subjects, n_subjects, dtype=np.int64)
+    worst = np.zeros(n_subjects, dtype=np.int64)
+    in_top_k = np.zeros(n_subjects, dtype=np.int64)
+    done = 0
+    progress(0, total)
+    for a in range(n + 1):
+        rest = n - a
+        b, c = np.meshgrid(np.arange(rest + 1), np.arange(rest + 1), indexing='ij')
+        valid = b + c <= rest
+        b, c = b[valid], c[valid]
+        weights = np.column_stack([np.full(len(b), a), b, c, rest - b - c]) / n
+
+        # Skor dihitung seperti SAWCalculator.calculate (jumlah matriks terbobot) + rank yang sama
+        scores = (normalized[None, :, :] * weights[:, None, :]).sum(axis=2)    # (n_bobot, n_mapel)
+        ranks = rank_descending(scores)
+        np.minimum(best, ranks.min(axis=0), out=best)
+        np.maximum(worst, ranks.max(axis=0), out=worst)
+        in_top_k += (ranks <= top_k).sum(axis=0)
+
+        done += len(weights)
+        progress(done, total)
+
+    subjects = []
+    for j, subject in enumerate(SUBJECTS):
+        subjects.append({
+            'subject': subject['name'],
+            'baseline_rank': int(baseline[j]),
+            'best_rank': int(best[j]),
+            'worst_rank': int(worst[j]),
+            'top_k_share': round(float(in_top_k[j]) / total, 4),
+        })
+    subjects.sort(key=lambda x: x['baseline_rank'])
+
+    return {
+        'combinations': total,
+        'step': step,
+        'baseline_weights': {k: DEFAULT_WEIGHTS[k] for k in CRITERIA_KEYS},
+        'subjects': subjects,
+    }
+
+
+# Jenis job -> fungsi (params divalidasi lebih dulu oleh routes.schemas.JOB_PARAMS)
+TASKS = {
+    'batch_recommend': batch_recommend,
+    'cohort_ingest': cohort_ingest,
+    'cohort_rescore': cohort_rescore,
+    'weight_sweep': weight_sweep,
+}
@@ -0,0 +1,139 @@
+"""
+Career Package Matcher
+Pencocokan paket karir / program studi berbasis vektor profil (RIASEC + mata pelajaran)
+"""
+
+import re
+import numpy as np
+from typing import List, Dict, Optional
+
+from models.saw_calculator import top_k_indices
+
+
+RIASEC_TYPES = ['realistic', 'investigative', 'artistic', 'social', 'enterprising', 'conventional']
+
+
+class CareerPackageIndex:
+    """
+    Indeks vektor paket karir yang dihitung sekali di awal.
+
+    Tiap paket memiliki:
+    - vektor RIASEC (dari `riasec_profile`)
+    - vektor mata pelajaran dalam urutan katalog (utama = 1.0, pendukung = 0.5)
+
+    Vektor dipusatkan (dikurangi rata-rata) lalu dinormalisasi L2, sehingga skor kecocokan
+    adalah korelasi antara profil siswa dan profil paket. Semua paket dinilai sekaligus
+    dengan satu perkalian matriks, baik untuk satu siswa maupun satu angkatan.
+    """
+
+    def __init__(
+        self,
+        packages: Dict[str, Dict],
+        subjects: List[Dict],
+        riasec_weight: float = 0.5,
+        keyword_bonus: float = 0.5
+    ):
+        """
+        Args:
+            packages: Katalog paket {key: {label, subjects, optional, riasec_profile, keywords, ...}}
+            subjects: Katalog mata pelajaran (menentukan urutan kolom vektor SAW)
+            riasec_weight: Porsi kecocokan RIASEC saat vektor SAW juga tersedia
+            keyword_bonus: Tambahan skor untuk paket yang cocok dengan kata kunci cita-cita
+        """
+        self.keys = list(packages.keys())
+        self.packages = packages
+        self.subject_names = [s['name'] for s in subjects]
+        self.riasec_weight = riasec_weight
+        self.keyword_bonus = keyword_bonus
+
+        subject_col = {name: j for j, name in enumerate(self.subject_names)}
+        riasec = np.zeros((len(self.keys), len(RIASEC_TYPES)), dtype=np.float32)
+        subject = np.zeros((len(self.keys), len(self.subject_names)), dtype=np.float32)
+
+        for i, key in enumerate(self.keys):
+            pkg = packages[key]
+            profile = pkg.get('riasec_profile', {})
+            riasec[i] = [profile.get(t, 0.0) for t in RIASEC_TYPES]
+            for name in pkg.get('optional', []):
+                if name in subject_col:
+                    subject[i, subject_col[name]] = 0.5
+            for name in pkg.get('subjects', []):
+                if name in subject_col:
+                    subject[i, subject_col[name]] = 1.0
+
+        # Disimpan transpose agar skor = student @ profile_T
+        self._riasec_T = np.ascontiguousarray(_center_normalize(riasec).T)
+        self._subject_T = np.ascontiguousarray(_center_normalize(subject).T)
+
+        # Kata kunci cita-cita -> indeks paket, dikompilasi sekali
+        self._keyword_index: Dict[str, List[int]] = {}
+        for i, key in enumerate(self.keys):
+            for kw in packages[key].get('keywords', []):
+                self._keyword_index.setdefault(kw.lower(), []).append(i)
+        alternatives = sorted(self._keyword_index, key=len, reverse=True)
+        self._keyword_re = re.compile(r'\b(' + '|'.join(re.escape(k) for k in alternatives) + r')\b') \
+            if alternatives else None
+
+    def riasec_vector(self, scores: Dict) -> np.ndarray:
+        """Ubah dict skor RIASEC menjadi vektor (6,)"""
+        return np.array([scores.get(t, 0.0) for t in RIASEC_TYPES], dtype=np.float32)
+
+    def saw_vector(self, recommendations: List[Dict]) -> np.ndarray:
+        """Ubah hasil recommend_subjects menjadi vektor skor SAW dalam urutan katalog"""
+        by_name = {r['subject']: r['score'] for r in recommendations}
+        return np.array([by_name.get(n, 0.0) for n in self.subject_names], dtype=np.float32)
+
+    def aspiration_mask(self, aspiration: str) -> np.ndarray:
+        """Vektor (n_paket,) bernilai 1 untuk paket yang kata kuncinya muncul di cita-cita"""
+        mask = np.zeros(len(self.keys), dtype=np.float32)
+        if aspiration and self._keyword_re is not None:
+            for kw in self._keyword_re.findall(aspiration.lower()):
+                mask[self._keyword_index[kw]] = 1.0
+        return mask
+
+    def score(
+        self,
+        riasec: np.ndarray,
+        saw: Optional[np.ndarray] = None,
+        aspiration_mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Skor kecocokan semua paket untuk satu atau banyak siswa.
+
+        Args:
+            riasec: (6,) atau (n_siswa, 6)
+            saw: (n_mapel,) atau (n_siswa, n_mapel), opsional
+            aspiration_mask: (n_paket,) atau (n_siswa, n_paket), opsional
+
+        Returns:
+            (n_paket,) atau (n_siswa, n_paket), rentang kira-kira [-1, 1 + keyword_bonus]
+        """
+        single = np.ndim(riasec) == 1
+        scores = _center_normalize(np.atleast_2d(riasec).astype(np.float32)) @ self._riasec_T
+
+        if saw is not None:
+            saw_scores = _center_normalize(np.atleast_2d(saw).astype(np.float32)) @ self._subject_T
+            scores = self.riasec_weight * scores + (1.0 - self.riasec_weight) * saw_scores
+
+        if aspiration_mask is not None:
+            scores = scores + self.keyword_bonus * np.atleast_2d(aspiration_mask)
+
+        return scores[0] if single else scores
+
+    def top_k(self, scores: np.ndarray, k: int = 3) -> np.ndarray:
+        """
+        Indeks k paket terbaik (terurut) per baris, tanpa mengurutkan seluruh katalog.
+
+        Returns:
+            (k,) atau (n_siswa, k)
+        """
+        if scores.ndim == 1:
+            return top_k_indices(scores[None, :], k)[0]
+        return top_k_indices(scores, k)
+
+
+def _center_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Pusatkan tiap baris ke rata-rata 0 lalu normalisasi L2 (baris konstan -> 0)"""
+    centered = matrix - matrix.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    return np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 0)
@@ -0,0 +1,282 @@
+"""
+Cohort Store
+Penyimpanan kolumnar on-disk (memory-mapped) untuk matriks kriteria seluruh siswa,
+sehingga perubahan bobot default atau nilai minimum bisa di-rescore tanpa replay request
+"""
+
+import json
+import os
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import List, Dict, Optional
+
+from models.saw_calculator import SAWCalculator, CRITERIA_KEYS, top_k_indices
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class CohortStore:
+    """
+    Matriks kriteria mentah per siswa (n_siswa x n_mapel x 4, float32) dalam file memmap.
+
+    Layout direktori:
+        meta.json      : jumlah siswa, kapasitas, katalog mapel
+        criteria.f32   : (kapasitas, n_mapel, 4) float32
+        student_ids.i64: (kapasitas,) int64
+
+    Rescore dialirkan per chunk berukuran cache melalui normalisasi + pembobotan SAW,
+    sehingga pemakaian RAM terbatas pada ukuran chunk + hasil top-k.
+
+    Satu baris per siswa: append bersifat upsert per student_id (indeks id -> baris di
+    memori), sehingga siswa yang dikirim ulang menimpa barisnya sendiri, bukan dihitung dua kali.
+
+    Append aman dari banyak proses sekaligus (worker web + worker job): tiap append
+    memegang flock pada file `lock` dan membaca ulang meta.json sebelum menulis.
+    """
+
+    N_CRITERIA = len(CRITERIA_KEYS)
+
+    def __init__(self, path: str):
+        """Buka store yang sudah ada (gunakan CohortStore.create untuk membuat baru)"""
+        self.path = path
+        self._lock = threading.Lock()
+
+        meta = _read_meta(path)
+        self.subject_names: List[str] = meta['subjects']
+        self._size: int = meta['size']
+        self._capacity: int = meta['capacity']
+        self._map()
+        self._rows: Dict[int, int] = {}
+        self._index_rows(0, self._size)
+
+    @classmethod
+    def create(cls, path: str, subjects: List[Dict], capacity: int = 1024) -> 'CohortStore':
+        """Buat store kosong di direktori `path`"""
+        os.makedirs(path, exist_ok=True)
+        n_subjects = len(subjects)
+        _allocate(os.path.join(path, 'criteria.f32'), capacity * n_subjects * cls.N_CRITERIA * 4)
+        _allocate(os.path.join(path, 'student_ids.i64'), capacity * 8)
+        _write_meta(path, [s['name'] for s in subjects], 0, capacity)
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, path: str, subjects: List[Dict], capacity: int = 1024) -> 'CohortStore':
+        """Buka store di `path`, atau buat baru bila belum ada (aman dipanggil banyak proses)"""
+        os.makedirs(path, exist_ok=True)
+        with _file_lock(path):
+            if not os.path.isfile(os.path.join(path, 'meta.json')):
+                cls.create(path, subjects, capacity)
+        store = cls(path)
+        if store.subject_names != [s['name'] for s in subjects]:
+            raise ValueError("Katalog mapel pada store tidak sesuai dengan katalog saat ini")
+        return store
+
+    def __len__(self) -> int:
+        """Jumlah siswa unik"""
+        return len(self._rows)
+
+    def append(self, criteria: np.ndarray, student_ids: np.ndarray, sync: bool = True) -> np.ndarray:
+        """
+        Simpan matriks kriteria mentah untuk banyak siswa (upsert per student_id).
+
+        Args:
+            criteria: (n, n_mapel, 4) hasil SAWCalculator.build_subject_matrix
+            student_ids: (n,) id siswa; id yang sudah ada ditimpa di barisnya,
+                         id yang muncul dua kali dalam satu batch memakai data terakhir
+            sync: msync file data sebelum meta.json ditulis. Tanpa sync, data tetap langsung
+                  terlihat oleh proses lain (page cache bersama), hanya belum tentu tahan crash OS.
+
+        Returns:
+            indeks baris tiap siswa
+        """
+        criteria = np.asarray(criteria, dtype=np.float32)
+        student_ids = np.asarray(student_ids, dtype=np.int64)
+        if criteria.ndim != 3 or criteria.shape[1:] != (len(self.subject_names), self.N_CRITERIA):
+            raise ValueError(f"Dimensi kriteria harus (n, {len(self.subject_names)}, {self.N_CRITERIA})")
+        if student_ids.shape != (criteria.shape[0],):
+            raise ValueError("Jumlah student_ids harus sama dengan jumlah matriks kriteria")
+
+        with self._lock, _file_lock(self.path):
+            # Proses lain mungkin sudah menambah baris / memperbesar file
+            self._refresh_locked()
+            rows = np.empty(len(student_ids), dtype=np.int64)
+            end = self._size
+            for i, sid in enumerate(student_ids.tolist()):
+                row = self._rows.get(sid)
+                if row is None:
+                    row = self._rows[sid] = end
+                    end += 1
+                rows[i] = row
+            if end > self._capacity:
+                self._grow(end)
+
+            # Baris yang sama ditulis sekali, dengan kemunculan terakhir dalam batch
+            unique_rows, last = np.unique(rows[::-1], return_index=True)
+            last = len(rows) - 1 - last
+            self._criteria[unique_rows] = criteria[last]
+            self._student_ids[unique_rows] = student_ids[last]
+            if sync:
+                self._criteria.flush()
+                self._student_ids.flush()
+            if end > self._size:
+                self._size = end
+                _write_meta(self.path, self.subject_names, self._size, self._capacity)
+        return rows
+
+    def criteria(self, row: int) -> np.ndarray:
+        """Matriks kriteria mentah (n_mapel x 4) untuk satu siswa"""
+        return np.array(self._criteria[row])
+
+    def rescore(
+        self,
+        weights: Optional[Dict] = None,
+        min_grades: Optional[Dict[str, float]] = None,
+        top_k: int = 5,
+        chunk_size: Optional[int] = None,
+        progress=None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Hitung ulang ranking SAW seluruh siswa dengan bobot / nilai minimum baru.
+
+        Args:
+            weights: Bobot {academic, riasec, aspiration, availability} (default: DEFAULT_WEIGHTS)
+            min_grades: Nilai minimum per mapel (mapel yang tidak disebut dianggap 0)
+            top_k: Jumlah mapel teratas yang disimpan per siswa
+            chunk_size: Jumlah siswa per chunk (default: ~2 MiB data kriteria per chunk)
+            progress: Callback opsional progress(selesai, total)
+
+        Returns:
+            student_ids (n,), top_subjects (n, k) indeks mapel, top_scores (n, k),
+            meets_minimum (n, k) bool; satu baris per siswa unik (baris terbaru)
+        """
+        saw = SAWCalculator()
+        saw.set_subject_criteria(weights)
+
+        n_subjects = len(self.subject_names)
+        thresholds = np.zeros(n_subjects, dtype=np.float32)
+        for j, name in enumerate(self.subject_names):
+            thresholds[j] = (min_grades or {}).get(name, 0) / 100.0
+
+        with self._lock:
+            self._refresh_locked()
+            size = self._size
+            criteria = self._criteria
+            student_ids = self._student_ids
+            # Store lama bisa berisi beberapa baris per siswa; hanya baris terbaru yang dihitung
+            latest = np.zeros(size, dtype=bool)
+            latest[np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))] = True
+
+        k = min(top_k, n_subjects)
+        chunk_size = chunk_size or max(1, (2 << 20) // (n_subjects * self.N_CRITERIA * 4))
+
+        top_subjects = np.empty((size, k), dtype=np.int16)
+        top_scores = np.empty((size, k), dtype=np.float32)
+        meets_minimum = np.empty((size, k), dtype=bool)
+
+        for start in range(0, size, chunk_size):
+            end = min(start + chunk_size, size)
+            chunk = np.asarray(criteria[start:end])
+            # float64 + aturan seri top_k_indices: urutan identik dengan /recommend
+            scores = saw.calculate_batch(chunk.astype(np.float64))
+
+            idx = top_k_indices(scores, k)
+            top_subjects[start:end] = idx
+            top_scores[start:end] = np.take_along_axis(scores, idx, axis=1)
+            academic = np.take_along_axis(chunk[:, :, 0], idx, axis=1)
+            meets_minimum[start:end] = academic + 1e-6 >= thresholds[idx]
+
+            if progress is not None:
+                progress(end, size)
+
+        if latest.all():
+            return {
+                'student_ids': np.array(student_ids[:size]),
+                'top_subjects': top_subjects,
+                'top_scores': top_scores,
+                'meets_minimum': meets_minimum,
+            }
+        return {
+            'student_ids': np.array(student_ids[:size])[latest],
+            'top_subjects': top_subjects[latest],
+            'top_scores': top_scores[latest],
+            'meets_minimum': meets_minimum[latest],
+        }
+
+    def _refresh_locked(self):
+        """Sinkronkan ukuran + kapasitas dengan meta.json (dipanggil di dalam lock)"""
+        meta = _read_meta(self.path)
+        if meta['capacity'] != self._capacity:
+            self._capacity = meta['capacity']
+            self._map()
+        if meta['size'] > self._size:
+            self._index_rows(self._size, meta['size'])
+            self._size = meta['size']
+
+    def _index_rows(self, start: int, end: int):
+        """Masukkan baris [start, end) ke indeks student_id -> baris (baris terakhir menang)"""
+        ids = self._student_ids[start:end].tolist()
+        self._rows.update(zip(ids, range(start, end)))
+
+    def _map(self):
+        """Petakan file data ke memmap sesuai kapasitas saat ini"""
+        n_subjects = len(self.subject_names)
+        self._criteria = np.memmap(
+            os.path.join(self.path, 'criteria.f32'), dtype=np.float32, mode='r+',
+            shape=(self._capacity, n_subjects, self.N_CRITERIA)
+        )
+        self._student_ids = np.memmap(
+            os.path.join(self.path, 'student_ids.i64'), dtype=np.int64, mode='r+',
+            shape=(self._capacity,)
+        )
+
+    def _grow(self, needed: int):
+        """Gandakan kapasitas file lalu petakan ulang (dipanggil di dalam lock)"""
+        capacity = max(self._capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+
+        self._criteria.flush()
+        self._student_ids.flush()
+        n_subjects = len(self.subject_names)
+        _allocate(os.path.join(self.path, 'criteria.f32'), capacity * n_subjects * self.N_CRITERIA * 4)
+        _allocate(os.path.join(self.path, 'student_ids.i64'), capacity * 8)
+        self._capacity = capacity
+        self._map()
+
+
+def _allocate(path: str, n_bytes: int):
+    """Pastikan file berukuran minimal n_bytes (sparse, tanpa menulis isi)"""
+    with open(path, 'ab') as f:
+        if f.tell() < n_bytes:
+            f.truncate(n_bytes)
+
+
+def _read_meta(path: str) -> Dict:
+    with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_meta(path: str, subjects: List[str], size: int, capacity: int):
+    """Tulis meta.json secara atomik"""
+    tmp = os.path.join(path, f'meta.json.{os.getpid()}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'subjects': subjects, 'size': size, 'capacity': capacity}, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(path, 'meta.json'))
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Lock antar proses pada direktori store (no-op tanpa fcntl)"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(path, 'lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -27,6 +27,8 @@ SUBJECTS = [
 ]
 
 # ─── Paket Rekomendasi berdasarkan Jalur Karir ────────────────────────────────
+# riasec_profile: bobot relevansi tiap dimensi RIASEC (0-1), dipakai sebagai vektor profil
+# keywords: kata kunci cita-cita yang mengarah ke paket ini
 CAREER_PACKAGES = {
     'kedokteran': {
         'label': 'Kedokteran & Kesehatan',
@@ -35,6 +37,8 @@ CAREER_PACKAGES = {
         'optional': ['Fisika'],
         'description': 'Cocok untuk calon dokter, dokter gigi, apoteker, perawat, dan tenaga kesehatan lainnya.',
         'universities': ['FK UI', 'FK UGM', 'FK UNAIR', 'FK UNDIP'],
+        'riasec_profile': {'realistic': 0.4, 'investigative': 1.0, 'artistic': 0.1, 'social': 0.8, 'enterprising': 0.2, 'conventional': 0.3},
+        'keywords': ['dokter', 'medis', 'kesehatan', 'perawat', 'apoteker', 'bidan'],
     },
     'teknik': {
         'label': 'Teknik & Rekayasa',
@@ -43,6 +47,8 @@ CAREER_PACKAGES = {
         'optional': ['Kimia'],
         'description': 'Untuk calon insinyur, arsitek, dan profesional di bidang teknik.',
         'universities': ['FT UI', 'FT ITS', 'FT ITB', 'FT UGM'],
+        'riasec_profile': {'realistic': 1.0, 'investigative': 0.8, 'artistic': 0.3, 'social': 0.1, 'enterprising': 0.2, 'conventional': 0.4},
+        'keywords': ['teknik', 'insinyur', 'arsitek'],
     },
     'ekonomi_bisnis': {
         'label': 'Ekonomi & Bisnis',
@@ -51,6 +57,8 @@ CAREER_PACKAGES = {
         'optional': ['Geografi'],
         'description': 'Persiapan untuk studi manajemen, akuntansi, keuangan, dan bisnis.',
         'universities': ['FEB UI', 'FEB UGM', 'FEB UNAIR'],
+        'riasec_profile': {'realistic': 0.1, 'investigative': 0.3, 'artistic': 0.1, 'social': 0.4, 'enterprising': 1.0, 'conventional': 0.8},
+        'keywords': ['ekonomi', 'ekonom', 'bisnis', 'akuntansi', 'akuntan', 'pengusaha', 'manajer'],
     },
     'sosial_humaniora': {
         'label': 'Ilmu Sosial & Humaniora',
@@ -59,6 +67,8 @@ CAREER_PACKAGES = {
         'optional': ['Geografi', 'Bahasa dan Sastra Indonesia'],
         'description': 'Untuk calon ilmuwan sosial, peneliti, dan pegiat humaniora.',
         'universities': ['FISIP UI', 'FISIPOL UGM', 'Fak. Hukum'],
+        'riasec_profile': {'realistic': 0.1, 'investigative': 0.5, 'artistic': 0.6, 'social': 1.0, 'enterprising': 0.4, 'conventional': 0.2},
+        'keywords': ['sosial', 'hukum', 'hakim', 'pengacara', 'psikolog', 'guru'],
     },
     'bahasa_sastra': {
         'label': 'Bahasa, Sastra & Komunikasi',
@@ -67,6 +77,8 @@ CAREER_PACKAGES = {
         'optional': ['Sejarah', 'Antropologi'],
         'description': 'Untuk calon penulis, jurnalis, penerjemah, dan diplomat.',
         'universities': ['FIB UI', 'FIB UGM', 'Fak. Komunikasi'],
+        'riasec_profile': {'realistic': 0.1, 'investigative': 0.3, 'artistic': 1.0, 'social': 0.7, 'enterprising': 0.4, 'conventional': 0.2},
+        'keywords': ['bahasa', 'penulis', 'jurnalis', 'penerjemah', 'diplomat'],
     },
     'sains_murni': {
         'label': 'Sains & Penelitian',
@@ -75,6 +87,8 @@ CAREER_PACKAGES = {
         'optional': ['Informatika'],
         'description': 'Untuk calon peneliti, ilmuwan, dan akademisi di bidang sains.',
         'universities': ['FMIPA UI', 'FMIPA UGM', 'FMIPA ITB'],
+        'riasec_profile': {'realistic': 0.6, 'investigative': 1.0, 'artistic': 0.2, 'social': 0.2, 'enterprising': 0.1, 'conventional': 0.5},
+        'keywords': ['sains', 'peneliti', 'ilmuwan'],
     },
     'teknologi_informasi': {
         'label': 'Teknologi Informasi',
@@ -83,6 +97,8 @@ CAREER_PACKAGES = {
         'optional': ['Kimia'],
         'description': 'Untuk calon programmer, data scientist, dan profesional IT.',
         'universities': ['FILKOM UB', 'IF ITS', 'Fasilkom UI'],
+        'riasec_profile': {'realistic': 0.6, 'investigative': 0.9, 'artistic': 0.3, 'social': 0.1, 'enterprising': 0.3, 'conventional': 0.8},
+        'keywords': ['it', 'programmer', 'komputer', 'data scientist'],
     },
 }
 
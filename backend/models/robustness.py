@@ -0,0 +1,135 @@
+"""
+Robustness Analysis
+Simulasi Monte Carlo ketidakpastian nilai rapor, jawaban RIASEC, dan bobot terhadap ranking SAW
+"""
+
+import numpy as np
+from typing import List, Dict, Optional
+
+from models.saw_calculator import (
+    SAWCalculator, DEFAULT_WEIGHTS, CRITERIA_KEYS, SUBJECT_RIASEC_MAP, rank_descending
+)
+from models.career_matcher import RIASEC_TYPES
+
+
+def simulate_rank_robustness(
+    student_data: Dict,
+    subjects_data: List[Dict],
+    weights: Optional[Dict] = None,
+    samples: int = 5000,
+    grade_noise: float = 2.0,
+    answer_noise: float = 0.5,
+    answers_per_dimension: int = 5,
+    dirichlet_concentration: Optional[float] = None,
+    top_k: int = 5,
+    seed: Optional[int] = None
+) -> Dict:
+    """
+    Hitung seberapa stabil ranking SAW terhadap gangguan input.
+
+    Semua sampel dibangkitkan sebagai satu tensor (samples x n_mapel x 4) dan dinilai sekaligus
+    dengan aritmetika dan aturan ranking yang sama dengan SAWCalculator.calculate, sehingga
+    tanpa derau hasilnya identik dengan ranking /recommend:
+    - C1: nilai rapor + N(0, grade_noise), hanya untuk mapel yang nilainya diisi, dipotong ke 0-100
+    - C2: rata-rata RIASEC + N(0, answer_noise / sqrt(answers_per_dimension)), dipotong ke 1-5,
+          hanya untuk dimensi yang diisi
+    - C3, C4: tetap (tidak bergantung pada data yang berderau)
+    - Bobot: tetap, atau Dirichlet(dirichlet_concentration * bobot) bila concentration diisi
+
+    Args:
+        student_data: grades, riasec_scores, aspiration (cita-cita)
+        subjects_data: List mata pelajaran
+        weights: Bobot {academic, riasec, aspiration, availability} (default: DEFAULT_WEIGHTS)
+        samples: Jumlah sampel Monte Carlo
+        grade_noise: Simpangan baku derau nilai rapor (poin, skala 0-100)
+        answer_noise: Simpangan baku derau per jawaban RIASEC (skala 1-5)
+        answers_per_dimension: Jumlah soal per dimensi RIASEC
+        dirichlet_concentration: Konsentrasi Dirichlet untuk bobot (None = bobot tetap)
+        top_k: Batas peringkat untuk probabilitas masuk top-k
+        seed: Seed generator acak (None = acak, seed yang dipakai dikembalikan)
+
+    Returns:
+        Dict berisi parameter simulasi dan statistik ranking per mapel
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    rng = np.random.default_rng(seed)
+    w = weights or DEFAULT_WEIGHTS
+    base_weights = np.array([w[k] for k in CRITERIA_KEYS], dtype=np.float64)
+
+    saw = SAWCalculator()
+    saw.set_subject_criteria(weights)
+    base = np.array(saw.build_subject_matrix(student_data, subjects_data), dtype=np.float64)
+    n_subjects = len(subjects_data)
+
+    tensor = np.broadcast_to(base, (samples, n_subjects, 4)).copy()
+
+    # C1: derau nilai rapor
+    grades = student_data.get('grades', {})
+    graded = np.array([s['name'] in grades for s in subjects_data])
+    if grade_noise > 0 and graded.any():
+        noise = rng.normal(0.0, grade_noise / 100.0, size=(samples, int(graded.sum())))
+        tensor[:, graded, 0] = np.clip(base[graded, 0] + noise, 0.0, 1.0)
+
+    # C2: derau jawaban RIASEC -> derau rata-rata dimensi -> kecocokan mapel
+    riasec_map, mapped = _riasec_match_matrix(subjects_data)
+    # Dimensi yang tidak diisi tetap 0 (sama dengan perhitungan langsung), tanpa derau
+    scores_in = student_data.get('riasec_scores', {})
+    supplied = np.array([t in scores_in for t in RIASEC_TYPES])
+    if answer_noise > 0 and mapped.any() and supplied.any():
+        riasec = np.array([scores_in.get(t, 0.0) for t in RIASEC_TYPES])
+        sigma = answer_noise / np.sqrt(answers_per_dimension)
+        sampled = np.broadcast_to(riasec, (samples, len(RIASEC_TYPES))).copy()
+        noise = rng.normal(0.0, sigma, size=(samples, int(supplied.sum())))
+        sampled[:, supplied] = np.clip(riasec[supplied] + noise, 1.0, 5.0)
+        tensor[:, mapped, 1] = np.minimum(sampled @ riasec_map[mapped].T / 5.0, 1.0)
+
+    normalized = saw.normalize_batch(tensor)
+    if dirichlet_concentration:
+        sampled_weights = rng.dirichlet(dirichlet_concentration * base_weights, size=samples)
+        scores = np.sum(normalized * sampled_weights[:, None, :], axis=-1)
+    else:
+        scores = np.sum(normalized * base_weights, axis=-1)
+
+    # Rank 1 = skor tertinggi, per sampel (aturan seri sama dengan SAWCalculator._rank)
+    ranks = rank_descending(scores)
+
+    k = min(top_k, n_subjects)
+    top_k_probability = (ranks <= k).mean(axis=0)
+    ci_low, median, ci_high = np.percentile(ranks, [2.5, 50, 97.5], axis=0, method='nearest')
+
+    subjects = []
+    for j, subject in enumerate(subjects_data):
+        subjects.append({
+            'subject': subject['name'],
+            'top_k_probability': round(float(top_k_probability[j]), 4),
+            'rank_median': int(median[j]),
+            'rank_ci95': [int(ci_low[j]), int(ci_high[j])],
+            'mean_score': round(float(scores[:, j].mean()), 4),
+        })
+    subjects.sort(key=lambda x: (x['rank_median'], -x['top_k_probability']))
+
+    return {
+        'samples': samples,
+        'seed': seed,
+        'top_k': k,
+        'grade_noise': grade_noise,
+        'answer_noise': answer_noise,
+        'dirichlet_concentration': dirichlet_concentration,
+        'subjects': subjects,
+    }
+
+
+def _riasec_match_matrix(subjects_data: List[Dict]):
+    """
+    Matriks rata-rata (n_mapel x 6) sehingga kecocokan RIASEC = min(M @ skor / 5, 1),
+    beserta mask mapel yang punya pemetaan (sisanya memakai nilai default tetap)
+    """
+    matrix = np.zeros((len(subjects_data), len(RIASEC_TYPES)))
+    mapped = np.zeros(len(subjects_data), dtype=bool)
+    for i, subject in enumerate(subjects_data):
+        types = SUBJECT_RIASEC_MAP.get(subject['name'], [])
+        for t in types:
+            matrix[i, RIASEC_TYPES.index(t)] = 1.0 / len(types)
+        mapped[i] = bool(types)
+    return matrix, mapped
@@ -7,6 +7,17 @@ import numpy as np
 from typing import List, Dict, Tuple, Optional
 
 
+# Bobot default kriteria rekomendasi mata pelajaran
+DEFAULT_WEIGHTS = {
+    'academic': 0.40,
+    'riasec': 0.30,
+    'aspiration': 0.20,
+    'availability': 0.10
+}
+
+CRITERIA_KEYS = ['academic', 'riasec', 'aspiration', 'availability']
+
+
 class SAWCalculator:
     """
     Implementasi Metode SAW (Simple Additive Weighting)
@@ -100,13 +111,49 @@ class SAWCalculator:
             'weights': self.weights.tolist(),
         }
 
+    def normalize_batch(self, tensor: np.ndarray) -> np.ndarray:
+        """
+        Normalisasi SAW untuk banyak matriks keputusan sekaligus.
+
+        Args:
+            tensor: (..., n_alternatif, n_kriteria); normalisasi per matriks (sumbu alternatif)
+        """
+        tensor = np.asarray(tensor)
+        dtype = np.result_type(tensor.dtype, np.float32)
+        normalized = np.empty(tensor.shape, dtype=dtype)
+
+        for j, ctype in enumerate(self.criteria_types):
+            col = tensor[..., j].astype(dtype, copy=False)
+            out = np.zeros(col.shape, dtype=dtype)
+            if ctype == 'benefit':
+                max_val = np.max(col, axis=-1, keepdims=True)
+                np.divide(col, max_val, out=out, where=max_val != 0)
+            else:  # cost
+                min_val = np.min(col, axis=-1, keepdims=True)
+                np.divide(min_val, col, out=out, where=col != 0)
+            normalized[..., j] = out
+
+        return normalized
+
+    def calculate_batch(self, tensor: np.ndarray) -> np.ndarray:
+        """
+        Hitung nilai preferensi SAW untuk banyak matriks keputusan sekaligus.
+
+        Args:
+            tensor: (..., n_alternatif, n_kriteria)
+
+        Returns:
+            (..., n_alternatif) nilai akhir
+        """
+        if self.weights is None or self.criteria_types is None:
+            raise RuntimeError("Kriteria belum di-set. Panggil set_criteria() terlebih dahulu.")
+
+        normalized = self.normalize_batch(tensor)
+        return normalized @ self.weights.astype(normalized.dtype)
+
     def _rank(self, scores: np.ndarray) -> np.ndarray:
         """Beri peringkat: nilai tertinggi = rank 1"""
-        sorted_indices = np.argsort(scores)[::-1]
-        ranks = np.zeros(len(scores), dtype=int)
-        for rank_pos, idx in enumerate(sorted_indices, 1):
-            ranks[idx] = rank_pos
-        return ranks
+        return rank_descending(scores)
 
     def recommend_subjects(
         self,
@@ -126,44 +173,10 @@ class SAWCalculator:
             subjects_data: List mata pelajaran
             weights: Custom bobot {academic, riasec, aspiration, availability}
         """
-        # Default weights
-        w = weights or {
-            'academic': 0.40,
-            'riasec': 0.30,
-            'aspiration': 0.20,
-            'availability': 0.10
-        }
-
-        self.set_criteria(
-            weights=[w['academic'], w['riasec'], w['aspiration'], w['availability']],
-            types=['benefit', 'benefit', 'benefit', 'benefit'],
-            names=['Nilai Akademik', 'Kecocokan RIASEC', 'Relevansi Cita-cita', 'Ketersediaan']
-        )
+        self.set_subject_criteria(weights)
 
-        grades = student_data.get('grades', {})
-        riasec = student_data.get('riasec_scores', {})
-        aspiration = student_data.get('aspiration', '')
-
-        matrix = []
-        alternatives = []
-
-        for subject in subjects_data:
-            name = subject['name']
-            alternatives.append(name)
-
-            # C1: Nilai akademik (0-100 -> 0-1)
-            academic_score = grades.get(name, 0) / 100.0
-
-            # C2: Kecocokan RIASEC
-            riasec_match = _calculate_riasec_match(name, riasec)
-
-            # C3: Relevansi cita-cita
-            aspiration_score = _calculate_aspiration_score(name, aspiration)
-
-            # C4: Ketersediaan di sekolah (simulasi berdasarkan kategori)
-            availability = _get_subject_availability(subject)
-
-            matrix.append([academic_score, riasec_match, aspiration_score, availability])
+        matrix = self.build_subject_matrix(student_data, subjects_data)
+        alternatives = [subject['name'] for subject in subjects_data]
 
         result = self.calculate(np.array(matrix))
 
@@ -196,9 +209,93 @@ class SAWCalculator:
         recommendations.sort(key=lambda x: x['rank'])
         return recommendations
 
+    def set_subject_criteria(self, weights: Optional[Dict] = None):
+        """Set kriteria rekomendasi mata pelajaran (C1-C4) dengan bobot kustom atau default"""
+        w = weights or DEFAULT_WEIGHTS
+        self.set_criteria(
+            weights=[w[k] for k in CRITERIA_KEYS],
+            types=['benefit', 'benefit', 'benefit', 'benefit'],
+            names=['Nilai Akademik', 'Kecocokan RIASEC', 'Relevansi Cita-cita', 'Ketersediaan']
+        )
+
+    def build_subject_matrix(self, student_data: Dict, subjects_data: List[Dict]) -> List[List[float]]:
+        """
+        Bangun matriks keputusan mentah (n_mapel x 4) untuk satu siswa.
+
+        Args:
+            student_data: grades, riasec_scores, aspiration (cita-cita),
+                          grade_vector (opsional, nilai dalam urutan subjects_data)
+            subjects_data: List mata pelajaran
+        """
+        grades = student_data.get('grades', {})
+        grade_vector = student_data.get('grade_vector')
+        riasec = student_data.get('riasec_scores', {})
+        aspiration = student_data.get('aspiration', '')
+
+        matrix = []
+        for i, subject in enumerate(subjects_data):
+            name = subject['name']
+
+            # C1: Nilai akademik (0-100 -> 0-1)
+            if grade_vector is not None:
+                academic_score = float(grade_vector[i]) / 100.0
+            else:
+                academic_score = grades.get(name, 0) / 100.0
+
+            # C2: Kecocokan RIASEC
+            riasec_match = _calculate_riasec_match(name, riasec)
+
+            # C3: Relevansi cita-cita
+            aspiration_score = _calculate_aspiration_score(name, aspiration)
+
+            # C4: Ketersediaan di sekolah (simulasi berdasarkan kategori)
+            availability = _get_subject_availability(subject)
+
+            matrix.append([academic_score, riasec_match, aspiration_score, availability])
+
+        return matrix
+
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indeks k nilai tertinggi per baris (n, m) -> (n, k), terurut menurun, tanpa sort penuh.
+    Nilai yang sama memakai aturan rank_descending (indeks lebih besar lebih dulu), sehingga
+    indeks ke-i hasil ini selalu alternatif dengan rank i + 1.
+    """
+    scores = np.asarray(scores)
+    m = scores.shape[1]
+    k = min(k, m)
+    if k < m:
+        # Ambang = nilai terbesar ke-k; semua yang lebih besar pasti masuk, sisa kuota diisi
+        # nilai yang sama dengan ambang mulai dari indeks terbesar
+        kth = np.partition(scores, m - k, axis=1)[:, m - k, None]
+        above = scores > kth
+        tied = scores == kth
+        quota = k - above.sum(axis=1, keepdims=True)
+        tied_from_right = np.cumsum(tied[:, ::-1], axis=1)[:, ::-1]
+        selected = above | (tied & (tied_from_right <= quota))
+        part = np.nonzero(selected)[1].reshape(len(scores), k)
+    else:
+        part = np.broadcast_to(np.arange(m), scores.shape)
+    order = np.argsort(np.take_along_axis(scores, part, axis=1), axis=1, kind='stable')[:, ::-1]
+    return np.take_along_axis(part, order, axis=1)
+
+
+def rank_descending(scores: np.ndarray) -> np.ndarray:
+    """
+    Peringkat per baris (..., n): nilai tertinggi = rank 1.
+    Nilai yang sama: indeks lebih besar mendapat rank lebih kecil (urutan stabil yang dibalik),
+    dipakai bersama oleh SAWCalculator._rank dan simulasi robustness agar ranking konsisten.
+    """
+    scores = np.asarray(scores)
+    order = np.argsort(scores, axis=-1, kind='stable')[..., ::-1]
+    ranks = np.empty(order.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[-1] + 1), axis=-1)
+    return ranks
+
+
 # Pemetaan mata pelajaran -> tipe RIASEC yang cocok
 SUBJECT_RIASEC_MAP = {
     'Matematika Tingkat Lanjut': ['investigative', 'conventional'],
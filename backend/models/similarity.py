@@ -0,0 +1,533 @@
+"""
+Student Profile Store
+Pencarian "siswa yang mirip denganmu" (k-nearest neighbour) atas profil historis
+"""
+
+import json
+import os
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple
+
+from models.career_matcher import RIASEC_TYPES
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class StudentProfileStore:
+    """
+    Penyimpanan profil siswa historis + indeks k-NN eksak.
+
+    Tiap profil adalah vektor float32 berdimensi 6 + jumlah mapel:
+    - 6 rata-rata RIASEC (skala 1-5, disimpan / 5)
+    - nilai rapor per mapel dalam urutan katalog (skala 0-100, disimpan / 100)
+
+    Pilihan mapel akhir disimpan sebagai matriks boolean (n_profil x n_mapel), dan dimensi
+    yang benar-benar diisi siswa sebagai mask boolean (n_profil x dim). Dimensi yang tidak
+    diisi tidak dianggap 0: jarak hanya dihitung atas dimensi yang diisi query DAN profil,
+    lalu diskalakan ke jumlah dimensi query (seperti jarak Euclid NaN), sehingga profil yang
+    datanya sedikit tidak tampak lebih dekat. Profil tanpa dimensi bersama ada di urutan
+    terakhir. Insert bersifat amortized O(1) (kapasitas digandakan saat penuh), tanpa
+    rebuild indeks.
+
+    Untuk jutaan profil tersedia indeks aproksimasi IVF (build_ivf): profil dikelompokkan
+    ke centroid k-means, query hanya memindai n_probe kelompok terdekat. Profil baru
+    langsung dimasukkan ke kelompok centroid terdekat. Bila ivf_min_profiles diisi, IVF
+    dibangun otomatis (di thread latar belakang) saat jumlah profil melewati batas tersebut,
+    dan dibangun ulang setiap kali jumlah profil menjadi dua kali lipat sejak build terakhir.
+
+    Bila `path` diisi, profil disimpan append-only di file memmap sehingga bertahan saat
+    restart dan terlihat oleh semua proses worker yang membuka direktori yang sama:
+        meta.json  : jumlah profil, kapasitas, katalog mapel
+        vectors.f32: (kapasitas, dim) float32
+        choices.b1 : (kapasitas, n_mapel) bool
+        given.b1   : (kapasitas, dim) bool
+    Insert dari proses lain diambil saat query berikutnya (cek meta.json).
+    """
+
+    def __init__(self, subjects: List[Dict], capacity: int = 1024, path: Optional[str] = None,
+                 ivf_min_profiles: Optional[int] = None):
+        """
+        Args:
+            subjects: Katalog mata pelajaran (menentukan urutan kolom nilai rapor)
+            capacity: Kapasitas awal
+            path: Direktori penyimpanan memmap (None = hanya di memori)
+            ivf_min_profiles: Jumlah profil minimum untuk membangun IVF otomatis (None = manual)
+        """
+        self.subject_names = [s['name'] for s in subjects]
+        self.dim = len(RIASEC_TYPES) + len(self.subject_names)
+        self.path = path
+        self.ivf_min_profiles = ivf_min_profiles
+
+        self._lock = threading.Lock()
+        self._size = 0
+        self._meta_stamp = None
+
+        if path is None:
+            self._capacity = capacity
+            self._vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+            self._choices = np.zeros((capacity, len(self.subject_names)), dtype=bool)
+            self._given = np.zeros((capacity, self.dim), dtype=bool)
+        else:
+            os.makedirs(path, exist_ok=True)
+            with self._file_lock():
+                if not os.path.isfile(os.path.join(path, 'meta.json')):
+                    self._capacity = capacity
+                    self._allocate_files()
+                    _write_meta(path, self.subject_names, 0, capacity)
+                elif not os.path.isfile(os.path.join(path, 'given.b1')):
+                    # Store lama tanpa mask: profil yang ada dianggap lengkap
+                    self._migrate_given(_read_meta(path))
+            meta = _read_meta(path)
+            if meta['subjects'] != self.subject_names:
+                raise ValueError("Katalog mapel pada store tidak sesuai dengan katalog saat ini")
+            self._capacity = meta['capacity']
+            self._map()
+
+        # Indeks IVF (opsional)
+        self._centroids: Optional[np.ndarray] = None
+        self._ivf_lists: List[np.ndarray] = []
+        self._ivf_size = 0
+        self._ivf_thread: Optional[threading.Thread] = None
+        self.n_probe = 8
+
+        if path is not None:
+            self.refresh()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def encode(self, riasec_scores: Dict, grades: Dict) -> np.ndarray:
+        """Ubah skor RIASEC + nilai rapor menjadi vektor profil (dim,); dimensi kosong bernilai 0"""
+        vec = np.empty(self.dim, dtype=np.float32)
+        vec[:len(RIASEC_TYPES)] = [riasec_scores.get(t, 0.0) / 5.0 for t in RIASEC_TYPES]
+        vec[len(RIASEC_TYPES):] = [grades.get(n, 0.0) / 100.0 for n in self.subject_names]
+        return vec
+
+    def encode_given(self, riasec_scores: Dict, grades: Dict) -> np.ndarray:
+        """Mask boolean (dim,) dimensi yang benar-benar diisi (pasangan encode())"""
+        return np.array(
+            [t in riasec_scores for t in RIASEC_TYPES] + [n in grades for n in self.subject_names],
+            dtype=bool
+        )
+
+    def encode_choices(self, choices: List[str]) -> np.ndarray:
+        """Ubah daftar nama mapel pilihan menjadi mask boolean (n_mapel,)"""
+        chosen = set(choices)
+        return np.array([n in chosen for n in self.subject_names], dtype=bool)
+
+    def add(self, riasec_scores: Dict, grades: Dict, choices: List[str]) -> int:
+        """Tambah satu profil historis, kembalikan id-nya"""
+        ids = self.add_batch(
+            self.encode(riasec_scores, grades)[None, :],
+            self.encode_choices(choices)[None, :],
+            self.encode_given(riasec_scores, grades)[None, :]
+        )
+        return int(ids[0])
+
+    def add_batch(self, vectors: np.ndarray, choices: np.ndarray,
+                  given: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Tambah banyak profil sekaligus.
+
+        Args:
+            vectors: (n, dim) vektor profil hasil encode()
+            choices: (n, n_mapel) mask pilihan mapel
+            given: (n, dim) mask dimensi yang diisi hasil encode_given() (None = semua diisi)
+
+        Returns:
+            id profil yang baru ditambahkan
+        """
+        return self._add_batch(vectors, choices, given)
+
+    def _add_batch(self, vectors: np.ndarray, choices: np.ndarray, given: Optional[np.ndarray] = None,
+                   only_if_empty: bool = False) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        choices = np.asarray(choices, dtype=bool)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Dimensi vektor harus (n, {self.dim})")
+        if choices.shape != (vectors.shape[0], len(self.subject_names)):
+            raise ValueError("Dimensi pilihan mapel tidak sesuai dengan jumlah vektor")
+        if given is None:
+            given = np.ones(vectors.shape, dtype=bool)
+        given = np.asarray(given, dtype=bool)
+        if given.shape != vectors.shape:
+            raise ValueError("Dimensi mask isian tidak sesuai dengan dimensi vektor")
+
+        n = vectors.shape[0]
+        with self._lock, self._file_lock():
+            # Ambil dulu insert dari proses lain agar baris baru ditulis setelahnya
+            self._refresh_locked()
+            if only_if_empty and self._size > 0:
+                return np.empty(0, dtype=np.int64)
+
+            self._reserve(self._size + n)
+            start, end = self._size, self._size + n
+            self._vectors[start:end] = vectors
+            self._choices[start:end] = choices
+            self._given[start:end] = given
+            if self.path is not None:
+                self._vectors.flush()
+                self._choices.flush()
+                self._given.flush()
+                _write_meta(self.path, self.subject_names, end, self._capacity)
+                self._meta_stamp = _meta_stamp(self.path)
+            self._size = end
+            if self._centroids is not None:
+                self._ivf_insert(np.arange(start, end), vectors)
+
+        self._maybe_build_ivf()
+        return np.arange(start, end)
+
+    def refresh(self):
+        """Ambil profil yang ditambahkan proses lain sejak pembacaan terakhir (store memmap)"""
+        if self.path is None or _meta_stamp(self.path) == self._meta_stamp:
+            return
+        with self._lock:
+            self._refresh_locked()
+        self._maybe_build_ivf()
+
+    def _refresh_locked(self):
+        """Sinkronkan ukuran + kapasitas dengan meta.json (dipanggil di dalam lock)"""
+        if self.path is None:
+            return
+        stamp = _meta_stamp(self.path)
+        if stamp == self._meta_stamp:
+            return
+        meta = _read_meta(self.path)
+        self._meta_stamp = stamp
+        if meta['capacity'] != self._capacity:
+            self._capacity = meta['capacity']
+            self._map()
+
+        start, end = self._size, meta['size']
+        if end <= start:
+            return
+        self._size = end
+        if self._centroids is not None:
+            self._ivf_insert(np.arange(start, end), np.asarray(self._vectors[start:end]))
+
+    def build_ivf(self, n_lists: Optional[int] = None, n_probe: int = 8, iterations: int = 10,
+                  sample_size: int = 100_000, seed: int = 0):
+        """
+        Bangun indeks IVF (k-means kasar) atas profil yang tersimpan.
+
+        Args:
+            n_lists: Jumlah kelompok (default: sqrt(jumlah profil))
+            n_probe: Jumlah kelompok terdekat yang dipindai per query
+            iterations: Iterasi Lloyd k-means pada sampel
+            sample_size: Jumlah profil sampel untuk melatih centroid
+            seed: Seed acak untuk sampel dan inisialisasi
+        """
+        with self._lock:
+            size = self._size
+            vectors = self._vectors[:size]
+        if size == 0:
+            return
+
+        n_lists = min(n_lists or int(np.sqrt(size)), size)
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(size, min(sample_size, size), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = _nearest_centroid(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=n_lists)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+
+        labels = _nearest_centroid(vectors, centroids)
+        order = np.argsort(labels, kind='stable')
+        bounds = np.cumsum(np.bincount(labels, minlength=n_lists))[:-1]
+        lists = np.split(order, bounds)
+
+        with self._lock:
+            self._centroids = centroids
+            self._ivf_lists = lists
+            self._ivf_size = size
+            self.n_probe = n_probe
+            # Profil yang masuk selama build
+            if self._size > size:
+                self._ivf_insert(np.arange(size, self._size), self._vectors[size:self._size])
+
+    def _ivf_insert(self, ids: np.ndarray, vectors: np.ndarray):
+        """Masukkan profil baru ke kelompok IVF terdekat (dipanggil di dalam lock)"""
+        labels = _nearest_centroid(vectors, self._centroids)
+        for c in np.unique(labels):
+            self._ivf_lists[c] = np.concatenate([self._ivf_lists[c], ids[labels == c]])
+
+    def _maybe_build_ivf(self):
+        """Bangun (ulang) IVF di thread latar belakang bila jumlah profil melewati batas"""
+        if self.ivf_min_profiles is None:
+            return
+        with self._lock:
+            if self._size < self.ivf_min_profiles:
+                return
+            if self._centroids is not None and self._size < 2 * self._ivf_size:
+                return
+            if self._ivf_thread is not None and self._ivf_thread.is_alive():
+                return
+            # Query tetap memakai pemindaian eksak / IVF lama sampai build selesai
+            self._ivf_thread = threading.Thread(target=self._build_ivf_background, daemon=True)
+            self._ivf_thread.start()
+
+    def wait_for_ivf(self, timeout: Optional[float] = None):
+        """Tunggu build IVF latar belakang (termasuk rebuild lanjutan) selesai"""
+        while True:
+            with self._lock:
+                thread = self._ivf_thread
+            if thread is None:
+                return
+            thread.join(timeout)
+            if timeout is not None and thread.is_alive():
+                return
+
+    def _build_ivf_background(self):
+        self.build_ivf(n_probe=self.n_probe)
+        # Insert selama build bisa saja sudah melewati batas rebuild berikutnya
+        with self._lock:
+            self._ivf_thread = None
+        self._maybe_build_ivf()
+
+    def query(self, vector: np.ndarray, k: int = 20, exact: bool = False,
+              given: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cari k profil terdekat (jarak Euclid atas dimensi yang diisi) dari vektor query.
+
+        Args:
+            vector: Vektor profil hasil encode()
+            k: Jumlah tetangga
+            exact: Paksa pemindaian penuh walaupun indeks IVF tersedia
+            given: Mask dimensi yang diisi query hasil encode_given() (None = semua diisi)
+
+        Returns:
+            (ids, distances) terurut dari yang paling dekat; jarak inf untuk profil
+            tanpa dimensi bersama dengan query
+        """
+        self.refresh()
+
+        # Snapshot: insert berikutnya hanya menulis di luar [0, size) atau mengganti buffer/list
+        with self._lock:
+            size = self._size
+            vectors = self._vectors[:size]
+            stored_given = self._given[:size]
+            centroids = self._centroids
+            lists = list(self._ivf_lists)
+            n_probe = self.n_probe
+
+        q = np.asarray(vector, dtype=np.float32)
+        cols = np.arange(self.dim) if given is None else np.flatnonzero(np.asarray(given, dtype=bool))
+        q = q[cols]
+
+        if exact or centroids is None or n_probe >= len(centroids):
+            candidates = None
+            n = size
+        else:
+            centroid_dist = np.square(centroids[:, cols] - q).sum(axis=1)
+            probe = np.argpartition(centroid_dist, n_probe - 1)[:n_probe]
+            candidates = np.concatenate([lists[c] for c in probe])
+            n = len(candidates)
+
+        k = min(k, n)
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        sq_dist = np.empty(n, dtype=np.float32)
+        for chunk in range(0, n, _QUERY_CHUNK):
+            rows = slice(chunk, chunk + _QUERY_CHUNK) if candidates is None else candidates[chunk:chunk + _QUERY_CHUNK]
+            sq_dist[chunk:chunk + _QUERY_CHUNK] = _partial_sq_distance(
+                vectors[rows][:, cols], stored_given[rows][:, cols], q
+            )
+
+        if k < n:
+            ids = np.argpartition(sq_dist, k - 1)[:k]
+        else:
+            ids = np.arange(n)
+        ids = ids[np.argsort(sq_dist[ids], kind='stable')]
+        distances = np.sqrt(sq_dist[ids])
+        return (ids if candidates is None else candidates[ids]), distances
+
+    def profile(self, profile_id: int) -> Dict:
+        """Ambil kembali profil dalam bentuk dict (skala asli)"""
+        vec = self._vectors[profile_id]
+        given = self._given[profile_id]
+        n_riasec = len(RIASEC_TYPES)
+        return {
+            'id': int(profile_id),
+            'riasec_scores': {
+                t: round(float(vec[i]) * 5.0, 2) for i, t in enumerate(RIASEC_TYPES) if given[i]
+            },
+            'grades': {
+                n: round(float(vec[n_riasec + j]) * 100.0, 1)
+                for j, n in enumerate(self.subject_names) if given[n_riasec + j]
+            },
+            'choices': [n for j, n in enumerate(self.subject_names) if self._choices[profile_id, j]],
+        }
+
+    def choice_frequency(self, ids: np.ndarray) -> List[Dict]:
+        """Frekuensi pilihan mapel di antara profil-profil tertentu, terurut menurun"""
+        if len(ids) == 0:
+            return []
+        counts = self._choices[ids].sum(axis=0)
+        order = np.argsort(-counts, kind='stable')
+        return [
+            {'subject': self.subject_names[j], 'count': int(counts[j]), 'share': round(float(counts[j]) / len(ids), 4)}
+            for j in order if counts[j] > 0
+        ]
+
+    def save(self, path: str):
+        """Simpan seluruh profil ke file .npz"""
+        with self._lock:
+            np.savez(
+                path,
+                vectors=self._vectors[:self._size],
+                choices=self._choices[:self._size],
+                given=self._given[:self._size],
+                subjects=np.array(self.subject_names),
+            )
+
+    def load(self, path: str, only_if_empty: bool = False):
+        """
+        Muat profil dari file .npz (ditambahkan ke profil yang sudah ada).
+        File lama tanpa array `given` dimuat sebagai profil lengkap.
+
+        Args:
+            only_if_empty: Lewati bila store sudah berisi profil (impor awal sekali saja,
+                           aman dipanggil oleh setiap proses worker)
+        """
+        with np.load(path) as data:
+            if list(data['subjects']) != self.subject_names:
+                raise ValueError("Katalog mapel pada file tidak sesuai dengan katalog saat ini")
+            given = data['given'] if 'given' in data.files else None
+            self._add_batch(data['vectors'], data['choices'], given, only_if_empty=only_if_empty)
+
+    def _reserve(self, needed: int):
+        """Gandakan kapasitas bila perlu (dipanggil di dalam lock)"""
+        if needed <= self._capacity:
+            return
+        capacity = max(self._capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+
+        if self.path is None:
+            # Buffer baru, bukan resize in-place, agar snapshot query yang sedang berjalan tetap valid
+            vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+            choices = np.zeros((capacity, len(self.subject_names)), dtype=bool)
+            given = np.zeros((capacity, self.dim), dtype=bool)
+            vectors[:self._size] = self._vectors[:self._size]
+            choices[:self._size] = self._choices[:self._size]
+            given[:self._size] = self._given[:self._size]
+            self._vectors, self._choices, self._given = vectors, choices, given
+            self._capacity = capacity
+        else:
+            # File hanya diperbesar; memmap lama milik snapshot query tetap valid
+            self._vectors.flush()
+            self._choices.flush()
+            self._given.flush()
+            self._capacity = capacity
+            self._allocate_files()
+            self._map()
+
+    def _allocate_files(self):
+        _allocate(os.path.join(self.path, 'vectors.f32'), self._capacity * self.dim * 4)
+        _allocate(os.path.join(self.path, 'choices.b1'), self._capacity * len(self.subject_names))
+        _allocate(os.path.join(self.path, 'given.b1'), self._capacity * self.dim)
+
+    def _migrate_given(self, meta: Dict):
+        """Buat given.b1 untuk store lama, semua profil yang ada ditandai lengkap (di dalam file lock)"""
+        tmp = os.path.join(self.path, f'given.b1.{os.getpid()}.tmp')
+        _allocate(tmp, meta['capacity'] * self.dim)
+        if meta['size'] > 0:
+            given = np.memmap(tmp, dtype=bool, mode='r+', shape=(meta['capacity'], self.dim))
+            given[:meta['size']] = True
+            given.flush()
+            del given
+        os.replace(tmp, os.path.join(self.path, 'given.b1'))
+
+    def _map(self):
+        """Petakan file data ke memmap sesuai kapasitas saat ini"""
+        self._vectors = np.memmap(
+            os.path.join(self.path, 'vectors.f32'), dtype=np.float32, mode='r+',
+            shape=(self._capacity, self.dim)
+        )
+        self._choices = np.memmap(
+            os.path.join(self.path, 'choices.b1'), dtype=bool, mode='r+',
+            shape=(self._capacity, len(self.subject_names))
+        )
+        self._given = np.memmap(
+            os.path.join(self.path, 'given.b1'), dtype=bool, mode='r+',
+            shape=(self._capacity, self.dim)
+        )
+
+    @contextmanager
+    def _file_lock(self):
+        """Lock antar proses untuk insert ke store memmap (no-op tanpa path / tanpa fcntl)"""
+        if self.path is None or fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.path, 'lock'), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+_QUERY_CHUNK = 65_536
+
+
+def _partial_sq_distance(vectors: np.ndarray, given: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Jarak kuadrat atas dimensi yang diisi kedua pihak, diskalakan ke jumlah dimensi query.
+    Kolom `vectors`/`given` sudah dipilih sesuai dimensi query; tanpa dimensi bersama = inf.
+    """
+    diff = np.where(given, vectors - q, 0.0)
+    sq = np.einsum('ij,ij->i', diff, diff)
+    overlap = given.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(overlap > 0, sq * (len(q) / overlap), np.inf).astype(np.float32)
+
+
+def _nearest_centroid(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65_536) -> np.ndarray:
+    """Indeks centroid terdekat untuk tiap vektor, diproses per chunk agar memori terbatas"""
+    centroid_sq_norms = np.einsum('ij,ij->i', centroids, centroids)
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk):
+        block = vectors[start:start + chunk]
+        labels[start:start + chunk] = np.argmin(centroid_sq_norms - 2.0 * (block @ centroids.T), axis=1)
+    return labels
+
+
+def _allocate(path: str, n_bytes: int):
+    """Pastikan file berukuran minimal n_bytes (sparse, tanpa menulis isi)"""
+    with open(path, 'ab') as f:
+        if f.tell() < n_bytes:
+            f.truncate(n_bytes)
+
+
+def _read_meta(path: str) -> Dict:
+    with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_meta(path: str, subjects: List[str], size: int, capacity: int):
+    """Tulis meta.json secara atomik"""
+    tmp = os.path.join(path, f'meta.json.{os.getpid()}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'subjects': subjects, 'size': size, 'capacity': capacity}, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(path, 'meta.json'))
+
+
+def _meta_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """Penanda versi meta.json (inode + mtime) untuk deteksi insert dari proses lain"""
+    try:
+        st = os.stat(os.path.join(path, 'meta.json'))
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
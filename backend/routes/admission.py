@@ -0,0 +1,174 @@
+"""
+Admission Control untuk endpoint komputasi
+Membatasi komputasi paralel, antrean singkat dengan tenggat, load shedding (503),
+dan single-flight coalescing untuk request identik yang sedang berjalan.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class Overloaded(Exception):
+    """Dilempar ketika request ditolak karena server sedang penuh"""
+
+    def __init__(self, retry_after: int):
+        super().__init__('Server sedang sibuk, silakan coba beberapa saat lagi')
+        self.retry_after = retry_after
+
+
+class _Flight:
+    """Satu komputasi yang sedang berjalan, dibagi oleh request-request identik"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class AdmissionController:
+    """
+    Lapisan admisi terbatas untuk komputasi mahal.
+
+    - Maksimal `max_concurrent` komputasi berjalan bersamaan
+    - Maksimal `max_queue` request menunggu slot, masing-masing paling lama `queue_timeout` detik.
+      Antrean FIFO: slot yang dilepas langsung diserahkan ke penunggu terlama, dan request
+      baru tidak boleh menyalip selama masih ada yang menunggu
+    - Selebihnya langsung ditolak (Overloaded -> 503 + Retry-After)
+    - Request dengan kunci yang sama berbagi satu komputasi (single-flight)
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        max_queue: int = 16,
+        queue_timeout: float = 2.0,
+        retry_after: int = 1
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._free = max_concurrent
+        self._waiters: deque = deque()
+        self._flights: Dict[str, _Flight] = {}
+
+        self._running = 0
+        self._admitted = 0
+        self._shed = 0
+        self._coalesced = 0
+
+    def run(self, key: Optional[str], fn: Callable[[], Any]) -> Any:
+        """
+        Jalankan `fn` melalui lapisan admisi.
+
+        Args:
+            key: Kunci coalescing (None = tanpa coalescing)
+            fn: Komputasi yang dijalankan; hasilnya dibagi ke semua pemanggil dengan kunci sama
+        """
+        if key is None:
+            return self._admit(fn)
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._admit(fn)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _admit(self, fn: Callable[[], Any]) -> Any:
+        """Ambil slot komputasi (antre dengan tenggat) lalu jalankan fn"""
+        self._acquire()
+        try:
+            return fn()
+        finally:
+            self._release()
+
+    def _acquire(self):
+        """Ambil slot; bila penuh, antre FIFO sampai slot diserahkan atau tenggat habis"""
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                self._running += 1
+                self._admitted += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                self._shed += 1
+                raise Overloaded(self.retry_after)
+            granted = threading.Event()
+            self._waiters.append(granted)
+
+        granted.wait(self.queue_timeout)
+
+        with self._lock:
+            # Slot bisa saja diserahkan tepat saat tenggat habis
+            if not granted.is_set():
+                self._waiters.remove(granted)
+                self._shed += 1
+                raise Overloaded(self.retry_after)
+            self._running += 1
+            self._admitted += 1
+
+    def _release(self):
+        """Lepas slot: serahkan ke penunggu terlama, atau kembalikan ke slot bebas"""
+        with self._lock:
+            self._running -= 1
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._free += 1
+
+    def metrics(self) -> Dict:
+        """Snapshot metrik admisi"""
+        with self._lock:
+            return {
+                'queue_depth': len(self._waiters),
+                'running': self._running,
+                'in_flight_keys': len(self._flights),
+                'admitted': self._admitted,
+                'shed': self._shed,
+                'coalesced': self._coalesced,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'queue_timeout': self.queue_timeout,
+            }
+
+
+def coalesce_key(endpoint: str, payload: Any) -> str:
+    """Kunci coalescing deterministik dari nama endpoint + payload yang mempengaruhi hasil"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return endpoint + ':' + hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def from_env() -> AdmissionController:
+    """Buat AdmissionController dengan konfigurasi dari environment variable"""
+    return AdmissionController(
+        max_concurrent=int(os.environ.get('ADMISSION_MAX_CONCURRENT', 4)),
+        max_queue=int(os.environ.get('ADMISSION_MAX_QUEUE', 16)),
+        queue_timeout=float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 2.0)),
+        retry_after=int(os.environ.get('ADMISSION_RETRY_AFTER', 1)),
+    )
@@ -6,10 +6,50 @@ Blueprint: /api/v1/...
 from flask import Blueprint, request, jsonify
 from models.data import RIASEC_QUESTIONS, SUBJECTS, RIASEC_DESCRIPTIONS, CAREER_PACKAGES
 from models.saw_calculator import SAWCalculator
+from models.career_matcher import CareerPackageIndex
+from models.similarity import StudentProfileStore
+from models.cohort_store import CohortStore
+from models.robustness import simulate_rank_robustness
+from routes.admission import Overloaded, coalesce_key, from_env
+from routes import schemas
+from routes.schemas import ValidationError
+from jobs.manager import JobManager
+from jobs.tasks import COHORT_STORE_PATH
+from typing import Optional
 import datetime
+import numpy as np
+import os
 
 api = Blueprint('api', __name__, url_prefix='/api/v1')
-saw = SAWCalculator()
+admission = from_env()
+career_index = CareerPackageIndex(CAREER_PACKAGES, SUBJECTS)
+
+# Field paket karir yang hanya dipakai CareerPackageIndex, tidak dikirim ke klien
+_INTERNAL_PACKAGE_FIELDS = frozenset({'riasec_profile', 'keywords'})
+
+_instance_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance')
+
+# Profil historis siswa untuk /similar: memmap append-only yang dibagi semua worker,
+# IVF dibangun otomatis begitu jumlah profil cukup besar
+profile_store = StudentProfileStore(
+    SUBJECTS,
+    path=os.environ.get('SIMILAR_STORE_PATH', os.path.join(_instance_dir, 'profiles')),
+    ivf_min_profiles=int(os.environ.get('SIMILAR_IVF_MIN_PROFILES', 100_000)),
+)
+_profiles_path = os.environ.get('SIMILAR_PROFILES_PATH')
+if _profiles_path and os.path.isfile(_profiles_path):
+    # Impor awal dari .npz hanya bila store masih kosong
+    profile_store.load(_profiles_path, only_if_empty=True)
+
+# Matriks kriteria mentah tiap siswa yang dinilai, untuk rescore seluruh angkatan (job cohort_rescore)
+cohort_store = CohortStore.open_or_create(COHORT_STORE_PATH, SUBJECTS)
+
+# Job latar belakang (proses worker terpisah)
+job_manager = JobManager(
+    db_path=os.environ.get('JOBS_DB_PATH', os.path.join(_instance_dir, 'jobs.sqlite3')),
+    max_workers=int(os.environ.get('JOB_WORKERS', max(1, (os.cpu_count() or 2) - 1))),
+    default_memory_limit_mb=int(os.environ.get('JOB_MEMORY_LIMIT_MB', 0)) or None,
+)
 
 
 # ─── Health Check ─────────────────────────────────────────────────────────────
@@ -23,6 +63,12 @@ def health():
     })
 
 
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Metrik admission control endpoint komputasi"""
+    return jsonify({'success': True, 'data': {'admission': admission.metrics()}})
+
+
 # ─── RIASEC ───────────────────────────────────────────────────────────────────
 
 @api.route('/questions', methods=['GET'])
@@ -46,46 +92,20 @@ def calculate_riasec():
         answers: List[int] (length = jumlah soal, nilai 1-5)
     """
     try:
-        data = request.get_json(force=True)
-        answers = data.get('answers', [])
-        expected = len(RIASEC_QUESTIONS)
+        answers = schemas.riasec_request(schemas.decode(request.get_data())).answers
 
-        if len(answers) != expected:
-            return jsonify({'success': False, 'message': f'Jawaban harus berjumlah {expected} soal'}), 400
+        result = admission.run(
+            coalesce_key('riasec', answers),
+            lambda: _compute_riasec(answers)
+        )
 
-        if not all(isinstance(a, (int, float)) and 1 <= a <= 5 for a in answers):
-            return jsonify({'success': False, 'message': 'Nilai jawaban harus antara 1 dan 5'}), 400
+        return jsonify({'success': True, 'data': result})
 
-        # Inisialisasi skor per dimensi
-        totals = {d: [] for d in ['realistic', 'investigative', 'artistic', 'social', 'enterprising', 'conventional']}
+    except ValidationError as e:
+        return jsonify({'success': False, 'message': str(e), 'field': e.field}), 400
 
-        for i, answer in enumerate(answers):
-            q_type = RIASEC_QUESTIONS[i]['type']
-            totals[q_type].append(answer)
-
-        scores = {}
-        for dim, vals in totals.items():
-            scores[dim] = round(sum(vals) / len(vals), 2) if vals else 0.0
-
-        # Holland Code: 3 dimensi tertinggi
-        sorted_dims = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        holland_code = ''.join(d[0][0].upper() for d in sorted_dims[:3])
-        top_type = sorted_dims[0][0]
-
-        # Saran paket karir berdasarkan Holland Code
-        suggested_packages = _suggest_career_packages(holland_code, scores)
-
-        return jsonify({
-            'success': True,
-            'data': {
-                'scores': scores,
-                'holland_code': holland_code,
-                'top_type': top_type,
-                'top_description': RIASEC_DESCRIPTIONS.get(top_type, {}),
-                'sorted_dimensions': [{'type': d, 'score': s} for d, s in sorted_dims],
-                'suggested_packages': suggested_packages,
-            }
-        })
+    except Overloaded as e:
+        return _overloaded_response(e)
 
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -104,7 +124,7 @@ def get_subjects():
 @api.route('/career-packages', methods=['GET'])
 def get_career_packages():
     """Ambil semua paket rekomendasi karir"""
-    return jsonify({'success': True, 'data': CAREER_PACKAGES})
+    return jsonify({'success': True, 'data': {k: _public_package(p) for k, p in CAREER_PACKAGES.items()}})
 
 
 # ─── SAW Recommendation ───────────────────────────────────────────────────────
@@ -117,80 +137,199 @@ def recommend():
     Body JSON:
         student_name: str
         student_class: str
+        student_id: int (opsional)        # bila diisi, matriks kriteria disimpan ke cohort store
         grades: Dict[str, float]          # nama mapel -> nilai 0-100
         riasec_scores: Dict[str, float]   # dimensi -> rata-rata 1-5
         aspiration: str                   # cita-cita/jurusan yang diminati
         custom_weights: Dict (opsional)   # bobot kustom
+        robustness: bool | Dict (opsional) # simulasi Monte Carlo: samples, grade_noise,
+                                          # answer_noise, dirichlet_concentration, top_k, seed
 
     Returns:
         recommendations: List (diurutkan berdasarkan rank SAW)
         saw_summary: Detail perhitungan SAW
         career_match: Kecocokan dengan paket karir
+        robustness: Probabilitas top-k + interval kepercayaan rank per mapel (jika diminta)
+        cohort_row: Baris cohort store tempat siswa disimpan (jika student_id diisi)
     """
     try:
-        body = request.get_json(force=True)
-
-        student_name = body.get('student_name', 'Siswa')
-        student_class = body.get('student_class', '')
-        grades = body.get('grades', {})
-        riasec_scores = body.get('riasec_scores', {})
-        aspiration = body.get('aspiration', '')
-        custom_weights = body.get('custom_weights', None)
-
-        # Validasi minimal
-        if not grades:
-            return jsonify({'success': False, 'message': 'Data nilai (grades) tidak boleh kosong'}), 400
-
-        student_data = {
-            'grades': grades,
-            'riasec_scores': riasec_scores,
-            'aspiration': aspiration,
+        req = schemas.recommend_request(schemas.decode(request.get_data()))
+        student = req.student
+
+        inputs = {
+            'grades': student.grades,
+            'riasec_scores': student.riasec_scores,
+            'aspiration': student.aspiration,
+            'custom_weights': req.custom_weights,
+            'robustness': req.robustness._asdict() if req.robustness else None,
         }
 
-        recommendations = saw.recommend_subjects(student_data, SUBJECTS, weights=custom_weights)
-
-        # Identifikasi mata pelajaran wajib vs tidak tersedia
-        for rec in recommendations:
-            subject = next((s for s in SUBJECTS if s['name'] == rec['subject']), {})
-            min_grade = subject.get('min_grade', 0)
-            rec['meets_minimum'] = rec['academic_score'] >= min_grade
-            rec['min_grade'] = min_grade
-
-        # Kecocokan dengan paket karir
-        career_match = _match_career_packages(aspiration, recommendations)
-
-        # Summary SAW
-        top5 = [r['subject'] for r in recommendations[:5]]
-        saw_summary = {
-            'method': 'Simple Additive Weighting (SAW)',
-            'criteria': [
-                {'name': 'Nilai Akademik Rapor', 'weight': '40%', 'type': 'benefit'},
-                {'name': 'Kecocokan RIASEC',     'weight': '30%', 'type': 'benefit'},
-                {'name': 'Relevansi Cita-cita',  'weight': '20%', 'type': 'benefit'},
-                {'name': 'Ketersediaan di Sekolah', 'weight': '10%', 'type': 'benefit'},
-            ],
-            'total_alternatives': len(recommendations),
-            'top5': top5,
-        }
+        def compute():
+            result = _compute_recommendation(student, req.custom_weights, req.robustness)
+            if req.student_id is not None:
+                result['cohort_row'] = _store_cohort_row(req.student_id, student)
+            return result
+
+        # Penyimpanan ke cohort store ikut dibatasi admission control; student_id masuk kunci
+        # coalescing agar tiap siswa tetap tersimpan
+        if req.student_id is not None:
+            inputs['student_id'] = req.student_id
+        result = admission.run(coalesce_key('recommend', inputs), compute)
+
+        extra = {}
+        if 'robustness' in result:
+            extra['robustness'] = result['robustness']
+        if 'cohort_row' in result:
+            extra['cohort_row'] = result['cohort_row']
 
         return jsonify({
             'success': True,
             'data': {
-                'student_name': student_name,
-                'student_class': student_class,
-                'aspiration': aspiration,
-                'recommendations': recommendations,
-                'saw_summary': saw_summary,
-                'career_match': career_match,
+                'student_name': req.student_name,
+                'student_class': req.student_class,
+                'aspiration': student.aspiration,
+                'recommendations': result['recommendations'],
+                'saw_summary': result['saw_summary'],
+                'career_match': result['career_match'],
+                **extra,
                 'generated_at': datetime.datetime.utcnow().isoformat(),
             }
         })
 
+    except ValidationError as e:
+        return jsonify({'success': False, 'message': str(e), 'field': e.field}), 400
+
+    except Overloaded as e:
+        return _overloaded_response(e)
+
     except Exception as e:
         import traceback
         return jsonify({'success': False, 'message': str(e), 'trace': traceback.format_exc()}), 500
 
 
+# ─── Students Like You ────────────────────────────────────────────────────────
+
+@api.route('/similar', methods=['POST'])
+def similar_students():
+    """
+    Cari siswa historis dengan profil RIASEC + nilai rapor paling mirip.
+
+    Body JSON:
+        grades: Dict[str, float]          # nama mapel -> nilai 0-100
+        riasec_scores: Dict[str, float]   # dimensi -> rata-rata 1-5
+        k: int (opsional, default 20, maks 100)
+
+    Returns:
+        neighbours: profil terdekat beserta pilihan mapel akhirnya
+        choice_frequency: rekap pilihan mapel di antara tetangga
+    """
+    try:
+        req = schemas.similar_request(schemas.decode(request.get_data()))
+        grades, riasec_scores, k = req.student.grades, req.student.riasec_scores, req.k
+
+        def compute():
+            ids, distances = profile_store.query(
+                profile_store.encode(riasec_scores, grades), k,
+                given=profile_store.encode_given(riasec_scores, grades)
+            )
+            return {
+                'neighbours': [
+                    {**profile_store.profile(i), 'distance': round(float(d), 4)}
+                    for i, d in zip(ids, distances)
+                ],
+                'choice_frequency': profile_store.choice_frequency(ids),
+                'total_profiles': len(profile_store),
+            }
+
+        result = admission.run(
+            coalesce_key('similar', {'grades': grades, 'riasec_scores': riasec_scores, 'k': k}),
+            compute
+        )
+        return jsonify({'success': True, 'data': result})
+
+    except ValidationError as e:
+        return jsonify({'success': False, 'message': str(e), 'field': e.field}), 400
+
+    except Overloaded as e:
+        return _overloaded_response(e)
+
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@api.route('/similar/profiles', methods=['POST'])
+def add_similar_profiles():
+    """
+    Tambah profil historis siswa (inkremental, tanpa rebuild indeks).
+    Profil disimpan ke store memmap sehingga bertahan saat restart dan terlihat oleh semua worker.
+
+    Body JSON:
+        profiles: List[{grades, riasec_scores, choices: List[str]}]
+    """
+    try:
+        profiles = schemas.profiles_request(schemas.decode(request.get_data()))
+
+        ids = profile_store.add_batch(
+            [profile_store.encode(p.student.riasec_scores, p.student.grades) for p in profiles],
+            [profile_store.encode_choices(p.choices) for p in profiles],
+            [profile_store.encode_given(p.student.riasec_scores, p.student.grades) for p in profiles],
+        )
+
+        return jsonify({
+            'success': True,
+            'data': {'ids': ids.tolist(), 'total_profiles': len(profile_store)}
+        })
+
+    except ValidationError as e:
+        return jsonify({'success': False, 'message': str(e), 'field': e.field}), 400
+
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+# ─── Background Jobs ─────────────────────────────────────────────────────────
+
+@api.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Jalankan komputasi panjang di worker latar belakang.
+
+    Body JSON:
+        type: str                       # batch_recommend | cohort_ingest | cohort_rescore | weight_sweep
+        params: Dict                    # parameter sesuai jenis job
+        memory_limit_mb: int (opsional) # batas memori per job
+    """
+    try:
+        req = schemas.job_request(schemas.decode(request.get_data()))
+
+        job = job_manager.submit(req.type, req.params, req.memory_limit_mb)
+        return jsonify({'success': True, 'data': job}), 202
+
+    except ValidationError as e:
+        return jsonify({'success': False, 'message': str(e), 'field': e.field}), 400
+
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status, progress, hasil, dan timing job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Job tidak ditemukan'}), 404
+    return jsonify({'success': True, 'data': job})
+
+
+@api.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Batalkan job yang masih antre atau sedang berjalan"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Job tidak ditemukan'}), 404
+    return jsonify({'success': True, 'data': job})
+
+
 # ─── BK Consultation Simulation ───────────────────────────────────────────────
 
 @api.route('/bk-advice', methods=['POST'])
@@ -200,11 +339,10 @@ def bk_advice():
     Mengemulasi proses konsultasi akhir semester 2 kelas 10.
     """
     try:
-        body = request.get_json(force=True)
-        holland_code = body.get('holland_code', 'RIA')
-        top_recommendations = body.get('top_recommendations', [])
-        aspiration = body.get('aspiration', '')
-        meets_minimum = body.get('meets_minimum', True)
+        req = schemas.bk_advice_request(schemas.decode(request.get_data()))
+        holland_code = req.holland_code
+        aspiration = req.aspiration
+        meets_minimum = req.meets_minimum
 
         advice_points = []
 
@@ -245,55 +383,151 @@ def bk_advice():
             }
         })
 
+    except ValidationError as e:
+        return jsonify({'success': False, 'message': str(e), 'field': e.field}), 400
+
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
-def _suggest_career_packages(holland_code: str, scores: dict) -> list:
-    """Rekomendasikan paket karir berdasarkan Holland Code"""
-    suggestions = []
-    for key, pkg in CAREER_PACKAGES.items():
-        # Hitung kecocokan sederhana berdasarkan top dimensi
-        match_score = 0
-        for c in holland_code:
-            dim_map = {'R': 'realistic', 'I': 'investigative', 'A': 'artistic',
-                       'S': 'social', 'E': 'enterprising', 'C': 'conventional'}
-            dim = dim_map.get(c)
-            if dim:
-                match_score += scores.get(dim, 0)
-        suggestions.append({'key': key, 'label': pkg['label'], 'icon': pkg['icon'], 'match': round(match_score, 2)})
-    suggestions.sort(key=lambda x: x['match'], reverse=True)
-    return suggestions[:3]
-
-
-def _match_career_packages(aspiration: str, recommendations: list) -> dict:
-    """Cocokkan rekomendasi dengan paket karir berdasarkan cita-cita"""
-    if not aspiration:
-        return {}
+def _overloaded_response(e: Overloaded):
+    """Respons 503 + Retry-After saat request ditolak oleh admission control"""
+    response = jsonify({'success': False, 'message': str(e)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+
+def _compute_riasec(answers: list) -> dict:
+    """Hitung skor RIASEC, Holland Code, dan saran paket karir dari jawaban tervalidasi"""
+    # Inisialisasi skor per dimensi
+    totals = {d: [] for d in ['realistic', 'investigative', 'artistic', 'social', 'enterprising', 'conventional']}
+
+    for i, answer in enumerate(answers):
+        q_type = RIASEC_QUESTIONS[i]['type']
+        totals[q_type].append(answer)
+
+    scores = {}
+    for dim, vals in totals.items():
+        scores[dim] = round(sum(vals) / len(vals), 2) if vals else 0.0
+
+    # Holland Code: 3 dimensi tertinggi
+    sorted_dims = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    holland_code = ''.join(d[0][0].upper() for d in sorted_dims[:3])
+    top_type = sorted_dims[0][0]
+
+    # Saran paket karir berdasarkan kemiripan profil RIASEC
+    suggested_packages = _suggest_career_packages(scores)
+
+    return {
+        'scores': scores,
+        'holland_code': holland_code,
+        'top_type': top_type,
+        'top_description': RIASEC_DESCRIPTIONS.get(top_type, {}),
+        'sorted_dimensions': [{'type': d, 'score': s} for d, s in sorted_dims],
+        'suggested_packages': suggested_packages,
+    }
+
+
+def _store_cohort_row(student_id: int, student: schemas.StudentInput) -> int:
+    """
+    Upsert matriks kriteria siswa ke cohort store, kembalikan barisnya.
+    Tanpa msync di jalur request: data langsung terlihat oleh worker lain lewat page cache.
+    """
+    matrix = SAWCalculator().build_subject_matrix(student.as_student_data(), SUBJECTS)
+    return int(cohort_store.append(np.array([matrix]), np.array([student_id]), sync=False)[0])
+
+
+def _compute_recommendation(
+    student: schemas.StudentInput,
+    custom_weights,
+    robustness: Optional[schemas.RobustnessOptions] = None
+) -> dict:
+    """
+    Komputasi SAW untuk /recommend. Hanya bergantung pada input yang mempengaruhi hasil,
+    sehingga aman dibagi antar request identik (coalescing).
+    """
+    # Instance per komputasi: SAWCalculator menyimpan state kriteria, tidak aman dibagi antar thread
+    recommendations = SAWCalculator().recommend_subjects(
+        student.as_student_data(), SUBJECTS, weights=custom_weights
+    )
+
+    # Identifikasi mata pelajaran wajib vs tidak tersedia
+    for rec in recommendations:
+        subject = next((s for s in SUBJECTS if s['name'] == rec['subject']), {})
+        min_grade = subject.get('min_grade', 0)
+        rec['meets_minimum'] = rec['academic_score'] >= min_grade
+        rec['min_grade'] = min_grade
+
+    # Kecocokan dengan paket karir
+    career_match = _match_career_packages(student.aspiration, student.riasec_scores, recommendations)
+
+    # Summary SAW
+    top5 = [r['subject'] for r in recommendations[:5]]
+    saw_summary = {
+        'method': 'Simple Additive Weighting (SAW)',
+        'criteria': [
+            {'name': 'Nilai Akademik Rapor', 'weight': '40%', 'type': 'benefit'},
+            {'name': 'Kecocokan RIASEC',     'weight': '30%', 'type': 'benefit'},
+            {'name': 'Relevansi Cita-cita',  'weight': '20%', 'type': 'benefit'},
+            {'name': 'Ketersediaan di Sekolah', 'weight': '10%', 'type': 'benefit'},
+        ],
+        'total_alternatives': len(recommendations),
+        'top5': top5,
+    }
 
-    aspiration_lower = aspiration.lower()
-    best_match = None
-    best_score = 0
-
-    keyword_map = {
-        'dokter': 'kedokteran', 'medis': 'kedokteran', 'kesehatan': 'kedokteran',
-        'teknik': 'teknik', 'insinyur': 'teknik', 'arsitek': 'teknik',
-        'ekonomi': 'ekonomi_bisnis', 'bisnis': 'ekonomi_bisnis', 'akuntansi': 'ekonomi_bisnis',
-        'sosial': 'sosial_humaniora', 'hukum': 'sosial_humaniora',
-        'bahasa': 'bahasa_sastra', 'penulis': 'bahasa_sastra', 'jurnalis': 'bahasa_sastra',
-        'sains': 'sains_murni', 'peneliti': 'sains_murni', 'ilmuwan': 'sains_murni',
-        'it': 'teknologi_informasi', 'programmer': 'teknologi_informasi', 'komputer': 'teknologi_informasi',
+    result = {
+        'recommendations': recommendations,
+        'saw_summary': saw_summary,
+        'career_match': career_match,
     }
 
-    for keyword, pkg_key in keyword_map.items():
-        if keyword in aspiration_lower:
-            pkg = CAREER_PACKAGES.get(pkg_key, {})
-            rec_subjects = [r['subject'] for r in recommendations[:5]]
-            match = sum(1 for s in pkg.get('subjects', []) if s in rec_subjects)
-            if match > best_score:
-                best_score = match
-                best_match = {'key': pkg_key, **pkg, 'match_count': match}
+    # Simulasi ketidakpastian input (opsional)
+    if robustness is not None:
+        result['robustness'] = simulate_rank_robustness(
+            student.as_student_data(), SUBJECTS, weights=custom_weights,
+            answers_per_dimension=len(RIASEC_QUESTIONS) // 6,
+            **robustness._asdict()
+        )
+
+    return result
+
+
+def _suggest_career_packages(scores: dict) -> list:
+    """Rekomendasikan 3 paket karir dengan profil RIASEC paling mirip"""
+    match = career_index.score(career_index.riasec_vector(scores))
+    return [
+        {'key': career_index.keys[i], 'label': CAREER_PACKAGES[career_index.keys[i]]['label'],
+         'icon': CAREER_PACKAGES[career_index.keys[i]]['icon'], 'match': round(float(match[i]), 4)}
+        for i in career_index.top_k(match, 3)
+    ]
+
+
+def _public_package(pkg: dict) -> dict:
+    """Data paket karir untuk respons API, tanpa field internal pencocokan"""
+    return {k: v for k, v in pkg.items() if k not in _INTERNAL_PACKAGE_FIELDS}
+
+
+def _match_career_packages(aspiration: str, riasec_scores: dict, recommendations: list) -> dict:
+    """
+    Cocokkan paket karir terbaik berdasarkan profil RIASEC, skor SAW per mapel,
+    dan kata kunci cita-cita (bonus). Tanpa cita-cita dikembalikan {} seperti sebelumnya,
+    sehingga halaman hasil hanya menampilkan kartu karir bila siswa mengisi cita-cita.
+    """
+    if not aspiration:
+        return {}
 
-    return best_match or {}
\ No newline at end of file
+    match = career_index.score(
+        career_index.riasec_vector(riasec_scores),
+        career_index.saw_vector(recommendations),
+        career_index.aspiration_mask(aspiration),
+    )
+    best = int(career_index.top_k(match, 1)[0])
+    pkg_key = career_index.keys[best]
+    pkg = CAREER_PACKAGES[pkg_key]
+
+    rec_subjects = [r['subject'] for r in recommendations[:5]]
+    match_count = sum(1 for s in pkg.get('subjects', []) if s in rec_subjects)
+    return {'key': pkg_key, **_public_package(pkg), 'match_count': match_count, 'match': round(float(match[best]), 4)}
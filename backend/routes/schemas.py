@@ -0,0 +1,405 @@
+"""
+Request Schemas
+Decode body JSON langsung menjadi struct bertipe dengan validator yang disusun sekali saat import.
+Nilai rapor langsung diubah menjadi vektor NumPy dalam urutan katalog mata pelajaran.
+"""
+
+import json
+import math
+import numpy as np
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from models.data import SUBJECTS, RIASEC_QUESTIONS
+from models.career_matcher import RIASEC_TYPES
+from models.saw_calculator import CRITERIA_KEYS
+
+
+class ValidationError(Exception):
+    """Body request tidak valid; `field` menunjuk lokasi kesalahan (mis. grades.Fisika)"""
+
+    def __init__(self, field: str, message: str):
+        super().__init__(f'{field}: {message}' if field else message)
+        self.field = field
+
+
+# ─── Typed Structs ───────────────────────────────────────────────────────────
+
+class StudentInput(NamedTuple):
+    grades: Dict[str, float]
+    grade_vector: np.ndarray            # (n_mapel,) urutan SUBJECTS, skala 0-100
+    riasec_scores: Dict[str, float]
+    aspiration: str
+
+    def as_student_data(self) -> Dict:
+        """Bentuk dict yang dipakai SAWCalculator.recommend_subjects"""
+        return {
+            'grades': self.grades,
+            'grade_vector': self.grade_vector,
+            'riasec_scores': self.riasec_scores,
+            'aspiration': self.aspiration,
+        }
+
+
+class RobustnessOptions(NamedTuple):
+    samples: int
+    grade_noise: float
+    answer_noise: float
+    dirichlet_concentration: Optional[float]
+    top_k: int
+    seed: Optional[int]
+
+
+class RecommendRequest(NamedTuple):
+    student_name: str
+    student_class: str
+    student_id: Optional[int]
+    student: StudentInput
+    custom_weights: Optional[Dict[str, float]]
+    robustness: Optional[RobustnessOptions]
+
+
+class RiasecRequest(NamedTuple):
+    answers: List[float]
+
+
+class BKAdviceRequest(NamedTuple):
+    holland_code: str
+    top_recommendations: List[Any]
+    aspiration: str
+    meets_minimum: bool
+
+
+class SimilarRequest(NamedTuple):
+    student: StudentInput
+    k: int
+
+
+class ProfileInput(NamedTuple):
+    student: StudentInput
+    choices: List[str]
+
+
+class JobRequest(NamedTuple):
+    type: str
+    params: Dict
+    memory_limit_mb: Optional[int]
+
+
+# ─── Compiled Lookups ────────────────────────────────────────────────────────
+
+SUBJECT_NAMES = [s['name'] for s in SUBJECTS]
+_SUBJECT_INDEX = {name: j for j, name in enumerate(SUBJECT_NAMES)}
+_RIASEC_SET = frozenset(RIASEC_TYPES)
+_WEIGHT_SET = frozenset(CRITERIA_KEYS)
+_NUMBER_TYPES = frozenset({int, float})
+_N_ANSWERS = len(RIASEC_QUESTIONS)
+_HOLLAND_LETTERS = frozenset(t[0].upper() for t in RIASEC_TYPES)
+
+
+# ─── Primitive Validators ────────────────────────────────────────────────────
+
+def decode(raw: bytes) -> Dict:
+    """Decode body JSON; harus berupa object"""
+    try:
+        obj = json.loads(raw or b'null')
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError('', 'Body harus berupa JSON yang valid')
+    if not isinstance(obj, dict):
+        raise ValidationError('', 'Body harus berupa JSON object')
+    return obj
+
+
+def _object(value: Any, field: str) -> Dict:
+    if not isinstance(value, dict):
+        raise ValidationError(field, 'harus berupa object')
+    return value
+
+
+def _list(value: Any, field: str) -> List:
+    if not isinstance(value, list):
+        raise ValidationError(field, 'harus berupa array')
+    return value
+
+
+def _string(value: Any, field: str, max_length: int = 200) -> str:
+    if not isinstance(value, str):
+        raise ValidationError(field, 'harus berupa teks')
+    if len(value) > max_length:
+        raise ValidationError(field, f'maksimal {max_length} karakter')
+    return value
+
+
+def _integer(value: Any, field: str, low: int, high: int) -> int:
+    if type(value) is not int or not low <= value <= high:
+        raise ValidationError(field, f'harus bilangan bulat antara {low} dan {high}')
+    return value
+
+
+def _overflow_index(values: List) -> Optional[int]:
+    """Posisi pertama int JSON yang terlalu besar untuk float64 (None bila semua muat)"""
+    for i, v in enumerate(values):
+        try:
+            float(v)
+        except OverflowError:
+            return i
+    return None
+
+
+def _number(value: Any, field: str, low: float, high: float) -> float:
+    if type(value) not in _NUMBER_TYPES or not low <= value <= high:
+        raise ValidationError(field, f'harus angka antara {low:g} dan {high:g}')
+    return float(value)
+
+
+def _unknown_keys(obj: Dict, allowed: frozenset, field: str, what: str):
+    unknown = obj.keys() - allowed
+    if unknown:
+        raise ValidationError(field, f'{what} tidak dikenal: {", ".join(sorted(map(str, unknown)))}')
+
+
+# ─── Field Validators ────────────────────────────────────────────────────────
+
+def _grades(value: Any, field: str, required: bool = True) -> Tuple[Dict[str, float], np.ndarray]:
+    """Nilai rapor {mapel: 0-100} -> (dict float, vektor urutan katalog)"""
+    grades = _object(value, field)
+    if required and not grades:
+        raise ValidationError(field, 'Data nilai tidak boleh kosong')
+    _unknown_keys(grades, _SUBJECT_INDEX.keys(), field, 'Mata pelajaran')
+
+    vector = np.zeros(len(SUBJECT_NAMES), dtype=np.float64)
+    if not grades:
+        return {}, vector
+
+    if not set(map(type, grades.values())) <= _NUMBER_TYPES:
+        bad = next(k for k, v in grades.items() if type(v) not in _NUMBER_TYPES)
+        raise ValidationError(f'{field}.{bad}', 'harus berupa angka')
+
+    names, values = list(grades), list(grades.values())
+    overflow = _overflow_index(values)
+    if overflow is not None:
+        raise ValidationError(f'{field}.{names[overflow]}', 'harus angka antara 0 dan 100')
+
+    vector[[_SUBJECT_INDEX[k] for k in names]] = values
+    invalid = ~np.isfinite(vector) | (vector < 0) | (vector > 100)
+    if invalid.any():
+        raise ValidationError(f'{field}.{SUBJECT_NAMES[int(np.argmax(invalid))]}', 'harus angka antara 0 dan 100')
+
+    return {k: float(v) for k, v in grades.items()}, vector
+
+
+def _riasec_scores(value: Any, field: str) -> Dict[str, float]:
+    """Skor RIASEC {dimensi: 1-5}"""
+    scores = _object(value, field)
+    _unknown_keys(scores, _RIASEC_SET, field, 'Dimensi RIASEC')
+    return {k: _number(v, f'{field}.{k}', 1, 5) for k, v in scores.items()}
+
+
+def _weights(value: Any, field: str) -> Optional[Dict[str, float]]:
+    """Bobot kustom: keempat kriteria wajib ada, masing-masing 0-1, total 1"""
+    if value is None:
+        return None
+    weights = _object(value, field)
+    _unknown_keys(weights, _WEIGHT_SET, field, 'Kriteria')
+    missing = _WEIGHT_SET - weights.keys()
+    if missing:
+        raise ValidationError(field, f'Kriteria belum diisi: {", ".join(sorted(missing))}')
+    weights = {k: _number(weights[k], f'{field}.{k}', 0, 1) for k in CRITERIA_KEYS}
+    if not math.isclose(sum(weights.values()), 1.0, abs_tol=1e-4):
+        raise ValidationError(field, f'Total bobot harus 1.0, saat ini: {round(sum(weights.values()), 6)}')
+    return weights
+
+
+def _student(obj: Any, field: str = '', grades_required: bool = True) -> StudentInput:
+    """Profil siswa: grades, riasec_scores, aspiration"""
+    obj = _object(obj, field or 'body')
+    prefix = f'{field}.' if field else ''
+    grades, vector = _grades(obj.get('grades', {}), prefix + 'grades', required=grades_required)
+    return StudentInput(
+        grades=grades,
+        grade_vector=vector,
+        riasec_scores=_riasec_scores(obj.get('riasec_scores', {}), prefix + 'riasec_scores'),
+        aspiration=_string(obj.get('aspiration', ''), prefix + 'aspiration'),
+    )
+
+
+def _student_id(value: Any, field: str, required: bool = True) -> Optional[int]:
+    """Id siswa (int64 non-negatif) untuk CohortStore"""
+    if value is None and not required:
+        return None
+    return _integer(value, field, 0, 2 ** 63 - 1)
+
+
+def _students(value: Any, field: str, max_items: int = 100_000) -> List[StudentInput]:
+    students = _list(value, field)
+    if not students:
+        raise ValidationError(field, 'tidak boleh kosong')
+    if len(students) > max_items:
+        raise ValidationError(field, f'maksimal {max_items} siswa')
+    return [_student(s, f'{field}[{i}]') for i, s in enumerate(students)]
+
+
+def _robustness(value: Any, field: str) -> Optional[RobustnessOptions]:
+    """Opsi simulasi Monte Carlo; `true` = semua nilai default"""
+    if value is None or value is False:
+        return None
+    opts = {} if value is True else _object(value, field)
+    _unknown_keys(opts, frozenset(RobustnessOptions._fields), field, 'Opsi')
+    concentration = opts.get('dirichlet_concentration')
+    seed = opts.get('seed')
+    return RobustnessOptions(
+        samples=_integer(opts.get('samples', 5000), f'{field}.samples', 100, 50_000),
+        grade_noise=_number(opts.get('grade_noise', 2.0), f'{field}.grade_noise', 0, 25),
+        answer_noise=_number(opts.get('answer_noise', 0.5), f'{field}.answer_noise', 0, 2),
+        dirichlet_concentration=None if concentration is None
+        else _number(concentration, f'{field}.dirichlet_concentration', 1, 100_000),
+        top_k=_integer(opts.get('top_k', 5), f'{field}.top_k', 1, len(SUBJECT_NAMES)),
+        seed=None if seed is None else _integer(seed, f'{field}.seed', 0, 2 ** 32 - 1),
+    )
+
+
+# ─── Endpoint Schemas ────────────────────────────────────────────────────────
+
+def recommend_request(body: Dict) -> RecommendRequest:
+    """Body /recommend"""
+    return RecommendRequest(
+        student_name=_string(body.get('student_name', 'Siswa'), 'student_name'),
+        student_class=_string(body.get('student_class', ''), 'student_class'),
+        student_id=_student_id(body.get('student_id'), 'student_id', required=False),
+        student=_student(body),
+        custom_weights=_weights(body.get('custom_weights'), 'custom_weights'),
+        robustness=_robustness(body.get('robustness'), 'robustness'),
+    )
+
+
+def riasec_request(body: Dict) -> RiasecRequest:
+    """Body /riasec/calculate"""
+    answers = _list(body.get('answers', []), 'answers')
+    if len(answers) != _N_ANSWERS:
+        raise ValidationError('answers', f'Jawaban harus berjumlah {_N_ANSWERS} soal')
+    if not set(map(type, answers)) <= _NUMBER_TYPES:
+        i = next(i for i, a in enumerate(answers) if type(a) not in _NUMBER_TYPES)
+        raise ValidationError(f'answers[{i}]', 'harus berupa angka')
+    overflow = _overflow_index(answers)
+    if overflow is not None:
+        raise ValidationError(f'answers[{overflow}]', 'Nilai jawaban harus antara 1 dan 5')
+    values = np.asarray(answers, dtype=np.float64)
+    invalid = ~((values >= 1) & (values <= 5))
+    if invalid.any():
+        raise ValidationError(f'answers[{int(np.argmax(invalid))}]', 'Nilai jawaban harus antara 1 dan 5')
+    return RiasecRequest(answers=answers)
+
+
+def bk_advice_request(body: Dict) -> BKAdviceRequest:
+    """Body /bk-advice"""
+    holland_code = _string(body.get('holland_code', 'RIA'), 'holland_code', max_length=6).upper()
+    if not set(holland_code) <= _HOLLAND_LETTERS:
+        raise ValidationError('holland_code', 'hanya boleh berisi huruf R, I, A, S, E, C')
+    meets_minimum = body.get('meets_minimum', True)
+    if not isinstance(meets_minimum, bool):
+        raise ValidationError('meets_minimum', 'harus berupa boolean')
+    return BKAdviceRequest(
+        holland_code=holland_code,
+        top_recommendations=_list(body.get('top_recommendations', []), 'top_recommendations'),
+        aspiration=_string(body.get('aspiration', ''), 'aspiration'),
+        meets_minimum=meets_minimum,
+    )
+
+
+def similar_request(body: Dict) -> SimilarRequest:
+    """Body /similar"""
+    student = _student(body, grades_required=False)
+    if not student.grades and not student.riasec_scores:
+        raise ValidationError('', 'Data nilai (grades) atau skor RIASEC wajib diisi')
+    return SimilarRequest(student=student, k=_integer(body.get('k', 20), 'k', 1, 100))
+
+
+def profiles_request(body: Dict) -> List[ProfileInput]:
+    """Body /similar/profiles"""
+    profiles = _list(body.get('profiles', []), 'profiles')
+    if not profiles:
+        raise ValidationError('profiles', 'Daftar profil tidak boleh kosong')
+
+    result = []
+    for i, p in enumerate(profiles):
+        field = f'profiles[{i}]'
+        student = _student(p, field, grades_required=False)
+        choices = [_string(c, f'{field}.choices[{j}]')
+                   for j, c in enumerate(_list(p.get('choices', []), f'{field}.choices'))]
+        _unknown_keys(dict.fromkeys(choices), _SUBJECT_INDEX.keys(), f'{field}.choices', 'Mata pelajaran')
+        result.append(ProfileInput(student=student, choices=choices))
+    return result
+
+
+# ─── Job Schemas ─────────────────────────────────────────────────────────────
+# Menghasilkan params yang sudah dinormalisasi (JSON-serializable) untuk worker
+
+def _student_params(s: StudentInput) -> Dict:
+    return {'grades': s.grades, 'riasec_scores': s.riasec_scores, 'aspiration': s.aspiration}
+
+
+def _batch_recommend_params(params: Dict) -> Dict:
+    students = params.get('students', [])
+    validated = _students(students, 'params.students')
+    names = [_string(s.get('student_name', ''), f'params.students[{i}].student_name')
+             for i, s in enumerate(students)]
+    return {
+        'students': [{**_student_params(s), 'student_name': n} for s, n in zip(validated, names)],
+        'custom_weights': _weights(params.get('custom_weights'), 'params.custom_weights'),
+        'top_k': _integer(params.get('top_k', 5), 'params.top_k', 1, len(SUBJECT_NAMES)),
+    }
+
+
+def _cohort_ingest_params(params: Dict) -> Dict:
+    students = params.get('students', [])
+    validated = _students(students, 'params.students')
+    ids = [_student_id(s.get('student_id'), f'params.students[{i}].student_id') for i, s in enumerate(students)]
+    return {'students': [{**_student_params(s), 'student_id': i} for s, i in zip(validated, ids)]}
+
+
+def _cohort_rescore_params(params: Dict) -> Dict:
+    min_grades = params.get('min_grades')
+    if min_grades is not None:
+        min_grades = _object(min_grades, 'params.min_grades')
+        _unknown_keys(min_grades, _SUBJECT_INDEX.keys(), 'params.min_grades', 'Mata pelajaran')
+        min_grades = {k: _number(v, f'params.min_grades.{k}', 0, 100) for k, v in min_grades.items()}
+    if 'store_path' in params:
+        raise ValidationError('params.store_path', 'tidak didukung; store kohort ditentukan oleh server (COHORT_STORE_PATH)')
+    return {
+        'custom_weights': _weights(params.get('custom_weights'), 'params.custom_weights'),
+        'min_grades': min_grades,
+        'top_k': _integer(params.get('top_k', 5), 'params.top_k', 1, len(SUBJECT_NAMES)),
+    }
+
+
+def _weight_sweep_params(params: Dict) -> Dict:
+    step = _number(params.get('step', 0.05), 'params.step', 0.005, 1)
+    if not math.isclose(round(1.0 / step) * step, 1.0, rel_tol=1e-5):
+        raise ValidationError('params.step', 'harus membagi habis 1.0 (contoh: 0.1, 0.05, 0.01)')
+    return {
+        'student': _student_params(_student(params.get('student'), 'params.student')),
+        'step': step,
+        'top_k': _integer(params.get('top_k', 5), 'params.top_k', 1, len(SUBJECT_NAMES)),
+    }
+
+
+JOB_PARAMS: Dict[str, Callable[[Dict], Dict]] = {
+    'batch_recommend': _batch_recommend_params,
+    'cohort_ingest': _cohort_ingest_params,
+    'cohort_rescore': _cohort_rescore_params,
+    'weight_sweep': _weight_sweep_params,
+}
+
+
+def job_request(body: Dict) -> JobRequest:
+    """Body POST /jobs"""
+    job_type = body.get('type')
+    if job_type not in JOB_PARAMS:
+        raise ValidationError('type', f'Jenis job harus salah satu dari: {", ".join(JOB_PARAMS)}')
+    memory_limit_mb = body.get('memory_limit_mb')
+    if memory_limit_mb is not None:
+        memory_limit_mb = _integer(memory_limit_mb, 'memory_limit_mb', 1, 1 << 20)
+    return JobRequest(
+        type=job_type,
+        params=JOB_PARAMS[job_type](_object(body.get('params', {}), 'params')),
+        memory_limit_mb=memory_limit_mb,
+    )
@@ -0,0 +1,15 @@
+"""
+Konfigurasi pytest: backend di-import sebagai top-level (models, routes, jobs) seperti app.py,
+dan semua store on-disk milik routes.api diarahkan ke direktori sementara
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_instance = tempfile.mkdtemp(prefix='spk-test-')
+os.environ.setdefault('SIMILAR_STORE_PATH', os.path.join(_instance, 'profiles'))
+os.environ.setdefault('COHORT_STORE_PATH', os.path.join(_instance, 'cohort'))
+os.environ.setdefault('JOBS_DB_PATH', os.path.join(_instance, 'jobs.sqlite3'))
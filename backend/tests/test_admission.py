@@ -0,0 +1,153 @@
+"""
+Test AdmissionController: load shedding, tenggat antrean, urutan FIFO, coalescing, Retry-After
+"""
+
+import threading
+import time
+
+import pytest
+
+from routes.admission import AdmissionController, Overloaded
+
+
+def _hold(controller: AdmissionController, key=None):
+    """Tempati satu slot sampai event `release` di-set"""
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        return 'held'
+
+    thread = threading.Thread(target=controller.run, args=(key, fn))
+    thread.start()
+    assert started.wait(5)
+    return release, thread
+
+
+def _wait_for(predicate, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_sheds_when_queue_is_full():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, retry_after=3)
+    release, thread = _hold(controller)
+    try:
+        with pytest.raises(Overloaded) as e:
+            controller.run(None, lambda: 'never')
+        assert e.value.retry_after == 3
+    finally:
+        release.set()
+        thread.join()
+
+    assert controller.run(None, lambda: 'ok') == 'ok'
+    metrics = controller.metrics()
+    assert metrics['shed'] == 1 and metrics['admitted'] == 2 and metrics['running'] == 0
+
+
+def test_queued_request_is_shed_after_deadline():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.1)
+    release, thread = _hold(controller)
+    try:
+        start = time.monotonic()
+        with pytest.raises(Overloaded):
+            controller.run(None, lambda: 'never')
+        assert time.monotonic() - start >= 0.1
+        assert controller.metrics()['queue_depth'] == 0
+    finally:
+        release.set()
+        thread.join()
+    assert controller.metrics()['shed'] == 1
+
+
+def test_waiters_get_slots_before_new_arrivals():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5)
+    order = []
+    started, release = threading.Event(), threading.Event()
+
+    def holder():
+        def fn():
+            started.set()
+            release.wait(5)
+        controller.run(None, fn)
+        # Datang tepat setelah slot dilepas, saat penunggu sudah antre
+        controller.run(None, lambda: order.append('newcomer'))
+
+    holder_thread = threading.Thread(target=holder)
+    holder_thread.start()
+    assert started.wait(5)
+
+    waiter = threading.Thread(target=controller.run, args=(None, lambda: order.append('waiter')))
+    waiter.start()
+    _wait_for(lambda: controller.metrics()['queue_depth'] == 1)
+
+    release.set()
+    holder_thread.join()
+    waiter.join()
+    assert order == ['waiter', 'newcomer']
+
+
+def test_identical_requests_share_one_computation():
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    calls = []
+    gate = threading.Event()
+
+    def fn():
+        calls.append(1)
+        gate.wait(5)
+        return {'value': 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(controller.run('same', fn))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    _wait_for(lambda: controller.metrics()['coalesced'] == 4)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * 5
+    assert controller.metrics()['shed'] == 0
+
+
+def test_coalesced_requests_share_errors():
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    gate = threading.Event()
+
+    def failing():
+        gate.wait(5)
+        raise ValueError('gagal')
+
+    errors = []
+
+    def call():
+        try:
+            controller.run('k', failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    _wait_for(lambda: controller.metrics()['coalesced'] == 2)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert errors == ['gagal'] * 3
+    assert controller.metrics()['running'] == 0
+
+
+def test_overloaded_endpoint_returns_503_with_retry_after(monkeypatch):
+    from app import app
+    from routes import api
+
+    monkeypatch.setattr(api, 'admission', AdmissionController(max_concurrent=0, max_queue=0, retry_after=7))
+    response = app.test_client().post('/api/v1/riasec/calculate', json={'answers': [3] * 30})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
+    assert response.json['success'] is False
@@ -0,0 +1,47 @@
+"""
+Test endpoint /api/v1 lewat Flask test client
+"""
+
+import pytest
+
+from app import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+STUDENT = {'grades': {'Fisika': 88, 'Matematika Tingkat Lanjut': 90}, 'riasec_scores': {'investigative': 4, 'realistic': 3}}
+
+
+def test_career_match_empty_without_aspiration(client):
+    data = client.post('/api/v1/recommend', json=STUDENT).json['data']
+    assert data['career_match'] == {}
+
+
+def test_career_match_hides_internal_fields(client):
+    data = client.post('/api/v1/recommend', json={**STUDENT, 'aspiration': 'programmer'}).json['data']
+    match = data['career_match']
+    assert match['key'] == 'teknologi_informasi'
+    assert 'riasec_profile' not in match and 'keywords' not in match
+
+    packages = client.get('/api/v1/career-packages').json['data']
+    assert all('riasec_profile' not in p and 'keywords' not in p for p in packages.values())
+
+
+def test_recommend_with_student_id_upserts_cohort_row(client):
+    first = client.post('/api/v1/recommend', json={**STUDENT, 'student_id': 424242}).json['data']
+    again = client.post('/api/v1/recommend', json={**STUDENT, 'student_id': 424242}).json['data']
+    other = client.post('/api/v1/recommend', json={**STUDENT, 'student_id': 424243}).json['data']
+    assert first['cohort_row'] == again['cohort_row'] != other['cohort_row']
+
+
+@pytest.mark.parametrize('path, body, field', [
+    ('/api/v1/recommend', {**STUDENT, 'grades': {'Fisika': 10 ** 400}}, 'grades.Fisika'),
+    ('/api/v1/riasec/calculate', {'answers': [3] * 3 + [10 ** 400] + [3] * 26}, 'answers[3]'),
+    ('/api/v1/jobs', {'type': 'weight_sweep', 'params': {'student': STUDENT, 'step': 0.3}}, 'params.step'),
+])
+def test_invalid_numbers_rejected_with_field(client, path, body, field):
+    response = client.post(path, json=body)
+    assert response.status_code == 400 and response.json['field'] == field
@@ -0,0 +1,36 @@
+"""
+Test CareerPackageIndex
+"""
+
+import numpy as np
+
+from models.data import CAREER_PACKAGES, SUBJECTS
+from models.career_matcher import CareerPackageIndex
+
+
+index = CareerPackageIndex(CAREER_PACKAGES, SUBJECTS)
+
+
+def _flagged(aspiration: str):
+    return [index.keys[i] for i in np.flatnonzero(index.aspiration_mask(aspiration))]
+
+
+def test_short_keyword_does_not_match_inside_words():
+    # 'it' adalah kata kunci teknologi_informasi; tidak boleh cocok di 'itu' / 'ITB'
+    assert _flagged('ingin jadi guru seni itu') == ['sosial_humaniora']
+    assert _flagged('kuliah di ITB') == []
+
+
+def test_short_keyword_matches_whole_word():
+    assert _flagged('bekerja di bidang IT') == ['teknologi_informasi']
+    assert _flagged('IT, lalu data scientist') == ['teknologi_informasi']
+
+
+def test_top_k_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.normal(size=(50, len(index.keys))).astype(np.float32)
+
+    expected = np.argsort(-scores, axis=1, kind='stable')[:, :3]
+    np.testing.assert_array_equal(index.top_k(scores, 3), expected)
+    np.testing.assert_array_equal(index.top_k(scores[0], 3), expected[0])
+    assert index.top_k(scores[0], 100).shape == (len(index.keys),)
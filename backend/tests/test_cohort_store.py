@@ -0,0 +1,111 @@
+"""
+Test CohortStore: append -> buka ulang -> rescore, dan jalur ingest
+"""
+
+import numpy as np
+import pytest
+
+from models.data import SUBJECTS
+from models.saw_calculator import SAWCalculator
+from models.cohort_store import CohortStore
+from jobs import tasks
+from routes.schemas import ValidationError, job_request
+
+
+def _students(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    students = []
+    for i in range(n):
+        graded = rng.choice(len(SUBJECTS), size=8, replace=False)
+        students.append({
+            'student_id': 1000 + i,
+            'grades': {SUBJECTS[j]['name']: float(rng.integers(55, 100)) for j in graded},
+            'riasec_scores': {t: float(rng.integers(1, 6)) for t in
+                              ['realistic', 'investigative', 'artistic', 'social', 'enterprising', 'conventional']},
+            'aspiration': str(rng.choice(['dokter', 'programmer', 'guru', ''])),
+        })
+    return students
+
+
+def test_append_reopen_rescore_matches_live_ranking(tmp_path):
+    students = _students(50)
+    saw = SAWCalculator()
+
+    store = CohortStore.open_or_create(str(tmp_path), SUBJECTS, capacity=8)
+    for s in students:
+        store.append(np.array([saw.build_subject_matrix(s, SUBJECTS)]), np.array([s['student_id']]))
+
+    reopened = CohortStore(str(tmp_path))
+    assert len(reopened) == 50
+    result = reopened.rescore(top_k=3)
+
+    np.testing.assert_array_equal(result['student_ids'], [s['student_id'] for s in students])
+    for i, s in enumerate(students):
+        live = SAWCalculator().recommend_subjects(s, SUBJECTS)
+        live_scores = [r['score'] for r in live[:3]]
+        np.testing.assert_allclose(result['top_scores'][i], live_scores, atol=1e-4)
+        assert [reopened.subject_names[j] for j in result['top_subjects'][i]] == [r['subject'] for r in live[:3]]
+
+
+def test_append_upserts_by_student_id(tmp_path):
+    store = CohortStore.open_or_create(str(tmp_path), SUBJECTS)
+    block = np.ones((3, len(SUBJECTS), 4), dtype=np.float32)
+
+    assert store.append(block, np.array([1, 2, 3])).tolist() == [0, 1, 2]
+    assert store.append(block * 0.5, np.array([2, 4, 2]), sync=False).tolist() == [1, 3, 1]
+
+    reopened = CohortStore(str(tmp_path))
+    assert len(reopened) == 4
+    assert reopened.rescore()['student_ids'].tolist() == [1, 2, 3, 4]
+    np.testing.assert_array_equal(reopened.criteria(1), block[0] * 0.5)
+
+
+def test_rescore_counts_latest_row_of_legacy_duplicates(tmp_path):
+    # Store lama (sebelum upsert) bisa berisi beberapa baris untuk siswa yang sama
+    store = CohortStore.open_or_create(str(tmp_path), SUBJECTS)
+    store.append(np.ones((3, len(SUBJECTS), 4), dtype=np.float32), np.array([1, 2, 3]))
+    store._student_ids[2] = 1
+    store._student_ids.flush()
+
+    reopened = CohortStore(str(tmp_path))
+    assert len(reopened) == 2
+    assert reopened.rescore()['student_ids'].tolist() == [2, 1]
+
+
+def test_append_from_two_handles_does_not_overwrite(tmp_path):
+    a = CohortStore.open_or_create(str(tmp_path), SUBJECTS, capacity=2)
+    b = CohortStore.open_or_create(str(tmp_path), SUBJECTS)
+    block = np.ones((3, len(SUBJECTS), 4), dtype=np.float32)
+
+    a.append(block, np.array([1, 2, 3]))
+    assert b.append(block * 0.5, np.array([4, 5, 6])).tolist() == [3, 4, 5]
+    assert a.rescore()['student_ids'].tolist() == [1, 2, 3, 4, 5, 6]
+
+
+def test_cohort_ingest_task(tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks, 'COHORT_STORE_PATH', str(tmp_path))
+    students = _students(30, seed=1)
+    reported = []
+
+    result = tasks.cohort_ingest({'students': students}, lambda done, total: reported.append(done), 'job')
+
+    assert result == {'ingested': 30, 'first_row': 0, 'total_students': 30}
+    assert reported[-1] == 30
+    assert CohortStore(str(tmp_path)).rescore()['student_ids'].tolist() == [s['student_id'] for s in students]
+
+
+def test_cohort_rescore_ignores_client_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks, 'COHORT_STORE_PATH', str(tmp_path / 'cohort'))
+    tasks.cohort_ingest({'students': _students(5)}, lambda done, total: None, 'ingest')
+
+    result = tasks.cohort_rescore({'store_path': str(tmp_path / 'elsewhere')}, lambda done, total: None, 'abc')
+
+    assert result['output_file'] == 'rescore-abc.npz'
+    assert (tmp_path / 'cohort' / 'rescore-abc.npz').is_file()
+    assert not (tmp_path / 'elsewhere').exists()
+
+
+def test_job_schema_rejects_store_path():
+    with pytest.raises(ValidationError) as e:
+        job_request({'type': 'cohort_rescore', 'params': {'store_path': '/etc'}})
+    assert e.value.field == 'params.store_path'
@@ -0,0 +1,134 @@
+"""
+Test JobManager: reaper job yatim dan pemulihan pool worker yang mati
+"""
+
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+from jobs.manager import JobManager, _connect
+
+
+def _insert(db_path: str, job_id: str, status: str, owner_pid):
+    with _connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, type, status, params, owner_pid, created_at) VALUES (?, 'weight_sweep', ?, ?, ?, ?)",
+            (job_id, status, json.dumps({}), owner_pid, time.time())
+        )
+
+
+def test_startup_reaps_only_jobs_of_dead_owners(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    JobManager(db_path)
+
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    alive = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        _insert(db_path, 'dead-running', 'running', dead.pid)
+        _insert(db_path, 'dead-queued', 'queued', dead.pid)
+        _insert(db_path, 'alive-running', 'running', alive.pid)
+        _insert(db_path, 'legacy', 'running', None)
+
+        # Worker gunicorn lain yang (re)start tidak boleh menggagalkan job milik worker yang hidup
+        manager = JobManager(db_path)
+
+        status = {job_id: manager.get(job_id)['status']
+                  for job_id in ('dead-running', 'dead-queued', 'alive-running', 'legacy')}
+        assert status == {'dead-running': 'failed', 'dead-queued': 'failed',
+                          'alive-running': 'running', 'legacy': 'failed'}
+    finally:
+        alive.kill()
+        alive.wait()
+
+    assert manager.reap_orphans() == 1
+    assert manager.get('alive-running')['status'] == 'failed'
+
+
+def test_migrates_table_without_owner_column(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    with _connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, type TEXT NOT NULL, status TEXT NOT NULL, "
+            "params TEXT NOT NULL, result TEXT, error TEXT, progress REAL NOT NULL DEFAULT 0, "
+            "cancel_requested INTEGER NOT NULL DEFAULT 0, memory_limit_mb INTEGER, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        conn.execute("INSERT INTO jobs (id, type, status, params, created_at) VALUES ('old', 'x', 'running', '{}', 0)")
+
+    manager = JobManager(db_path)
+    assert manager.get('old')['status'] == 'failed'
+
+
+# ─── Process Pool ────────────────────────────────────────────────────────────
+
+SWEEP = {
+    'student': {'grades': {'Fisika': 90, 'Biologi': 75}, 'riasec_scores': {'investigative': 4}, 'aspiration': ''},
+    'step': 0.1,
+    'top_k': 5,
+}
+
+
+def _wait(manager: JobManager, job_id: str, timeout: float = 60) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'Job {job_id} tidak selesai: {manager.get(job_id)}')
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(str(tmp_path / 'jobs.sqlite3'), max_workers=1)
+    yield manager
+    if manager._executor is not None:
+        manager._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def test_pool_does_not_fork_from_request_thread(manager):
+    job = manager.submit('weight_sweep', SWEEP)
+    assert _wait(manager, job['id'])['status'] == 'succeeded'
+    assert manager._executor._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason='butuh SIGKILL')
+def test_submit_recovers_after_worker_is_killed(manager):
+    job = manager.submit('weight_sweep', SWEEP)
+    assert _wait(manager, job['id'])['status'] == 'succeeded'
+
+    broken = manager._executor
+    for pid in list(broken._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    # Submit pertama bisa saja masih masuk ke pool lama sebelum kerusakannya terdeteksi
+    # (job itu lalu ditandai failed); submit berikutnya harus memakai pool baru
+    jobs = []
+    for _ in range(3):
+        jobs.append(manager.submit('weight_sweep', SWEEP))
+        time.sleep(0.2)
+
+    finished = [_wait(manager, j['id']) for j in jobs]
+    assert manager._executor is not broken
+    assert finished[-1]['status'] == 'succeeded'
+    assert all(j['status'] in ('succeeded', 'failed') for j in finished)
+
+
+def test_failed_schedule_marks_row_failed(manager, monkeypatch):
+    def broken_pool():
+        raise RuntimeError('pool tidak tersedia')
+
+    monkeypatch.setattr(manager, '_create_executor', broken_pool)
+    with pytest.raises(RuntimeError):
+        manager.submit('weight_sweep', SWEEP)
+
+    with sqlite3.connect(manager.db_path) as conn:
+        statuses = [r[0] for r in conn.execute('SELECT status FROM jobs')]
+    assert statuses == ['failed']
@@ -0,0 +1,93 @@
+"""
+Test StudentProfileStore (memmap append-only + IVF otomatis)
+"""
+
+import numpy as np
+
+from models.data import SUBJECTS
+from models.similarity import StudentProfileStore
+
+
+def _profiles(n: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.random((n, dim), dtype=np.float32)
+    choices = rng.random((n, len(SUBJECTS))) < 0.3
+    return vectors, choices
+
+
+def test_inserts_survive_reopen(tmp_path):
+    store = StudentProfileStore(SUBJECTS, capacity=4, path=str(tmp_path))
+    vectors, choices = _profiles(10, store.dim)
+    store.add_batch(vectors, choices)
+
+    reopened = StudentProfileStore(SUBJECTS, path=str(tmp_path))
+    assert len(reopened) == 10
+    ids, distances = reopened.query(vectors[7], k=1, exact=True)
+    assert ids[0] == 7 and distances[0] < 1e-3
+    np.testing.assert_array_equal(reopened._choices[:10], choices)
+
+
+def test_inserts_visible_to_other_instances(tmp_path):
+    # Dua instance pada direktori yang sama mewakili dua proses worker
+    a = StudentProfileStore(SUBJECTS, path=str(tmp_path))
+    b = StudentProfileStore(SUBJECTS, path=str(tmp_path))
+    vectors, choices = _profiles(3000, a.dim)
+
+    a.add_batch(vectors[:2000], choices[:2000])
+    assert b.add_batch(vectors[2000:], choices[2000:]).tolist() == list(range(2000, 3000))
+
+    ids, _ = a.query(vectors[2500], k=1, exact=True)
+    assert ids[0] == 2500 and len(a) == 3000
+
+
+def test_only_if_empty_import(tmp_path):
+    store = StudentProfileStore(SUBJECTS, path=str(tmp_path / 'store'))
+    vectors, choices = _profiles(5, store.dim)
+    source = StudentProfileStore(SUBJECTS)
+    source.add_batch(vectors, choices)
+    source.save(str(tmp_path / 'seed.npz'))
+
+    store.load(str(tmp_path / 'seed.npz'), only_if_empty=True)
+    store.load(str(tmp_path / 'seed.npz'), only_if_empty=True)
+    assert len(store) == 5
+
+
+def test_ivf_built_once_store_passes_threshold(tmp_path):
+    store = StudentProfileStore(SUBJECTS, path=str(tmp_path), ivf_min_profiles=500)
+    vectors, choices = _profiles(1000, store.dim)
+
+    store.add_batch(vectors[:400], choices[:400])
+    assert store._ivf_thread is None
+
+    store.add_batch(vectors[400:], choices[400:])
+    store.wait_for_ivf()
+    assert store._centroids is not None and store._ivf_size == 1000
+    assert sum(len(lst) for lst in store._ivf_lists) == 1000
+
+    # Insert setelah build langsung masuk ke kelompok IVF
+    store.add_batch(vectors[:10], choices[:10])
+    assert sum(len(lst) for lst in store._ivf_lists) == 1010
+
+
+def test_query_ignores_dimensions_not_given():
+    store = StudentProfileStore(SUBJECTS)
+    exact_match = {'investigative': 5, 'realistic': 5}
+    store.add({'artistic': 5, 'social': 5}, {}, [])
+    store.add(exact_match, {'Fisika': 90, 'Kimia': 85}, ['Fisika'])
+
+    ids, distances = store.query(
+        store.encode(exact_match, {}), k=2, given=store.encode_given(exact_match, {})
+    )
+    assert ids.tolist() == [1, 0] and distances[0] == 0.0
+    assert store.profile(0)['grades'] == {}
+
+
+def test_store_without_given_mask_treated_as_complete(tmp_path):
+    store = StudentProfileStore(SUBJECTS, path=str(tmp_path))
+    vectors, choices = _profiles(5, store.dim)
+    store.add_batch(vectors, choices)
+    (tmp_path / 'given.b1').unlink()
+
+    reopened = StudentProfileStore(SUBJECTS, path=str(tmp_path))
+    assert reopened._given[:5].all()
+    assert len(reopened.profile(3)['grades']) == len(SUBJECTS)
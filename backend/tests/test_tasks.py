@@ -0,0 +1,63 @@
+"""
+Test task job (dipanggil langsung, tanpa JobManager)
+"""
+
+import numpy as np
+import pytest
+
+from app import app
+from jobs.tasks import batch_recommend, weight_sweep
+from models.saw_calculator import top_k_indices, rank_descending
+
+
+# Banyak mapel dengan skor sama: urutan seri harus identik dengan /recommend
+TIED_STUDENT = {'grades': {'Fisika': 80}, 'riasec_scores': {'investigative': 4}}
+
+
+def _no_progress(done, total):
+    pass
+
+
+def test_top_k_indices_follows_rank_descending_ties():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 3, (50, 14)).astype(float)
+    for k in (1, 5, 14):
+        expected = np.argsort(rank_descending(scores), axis=1)[:, :k]
+        np.testing.assert_array_equal(top_k_indices(scores, k), expected)
+
+
+def test_batch_recommend_matches_recommend_endpoint():
+    live = app.test_client().post('/api/v1/recommend', json=TIED_STUDENT).json['data']['recommendations']
+    result = batch_recommend({'students': [TIED_STUDENT], 'top_k': 5}, _no_progress, 'job')
+    assert [s['subject'] for s in result['students'][0]['top_subjects']] == [r['subject'] for r in live[:5]]
+
+
+def test_weight_sweep_baseline_inside_sweep_range():
+    calls = []
+    result = weight_sweep({'student': TIED_STUDENT, 'step': 0.05, 'top_k': 5},
+                          lambda done, total: calls.append((done, total)), 'job')
+    for s in result['subjects']:
+        assert s['best_rank'] <= s['baseline_rank'] <= s['worst_rank']
+        if s['baseline_rank'] <= 5:
+            assert s['top_k_share'] > 0
+
+    # Progress dilaporkan per chunk grid, bukan hanya awal/akhir
+    assert len(calls) > 2 and calls[-1] == (result['combinations'], result['combinations'])
+
+
+def test_weight_sweep_stops_on_cancel():
+    class Cancelled(Exception):
+        pass
+
+    calls = []
+
+    def progress(done, total):
+        calls.append((done, total))
+        if done > 0:
+            raise Cancelled()
+
+    with pytest.raises(Cancelled):
+        weight_sweep({'student': TIED_STUDENT, 'step': 0.01}, progress, 'job')
+    # Berhenti setelah chunk pertama, jauh sebelum seluruh grid dihitung
+    done, total = calls[-1]
+    assert len(calls) == 2 and done < total